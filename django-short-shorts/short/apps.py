@@ -1,13 +1,46 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+
+from django.db.models.signals import pre_init, class_prepared
+from django.utils.autoreload import file_changed
 
-from django.db.models.signals import pre_init
 
 class ShortConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'short'
 
+    def import_models(self):
+        super().import_models()
+        # The short package imports short.models before the app registry
+        # is ready; the concrete models are imported here.
+        from . import rollup
+
     def ready(self):
         # Implicitly connect a signal handlers decorated with @receiver.
-        from . import signals
-        # Explicitly connect a signal handler.
-        pre_init.connect(signals.model_pre_init)
+        from . import signals, conf, rollup, templatememo
+        from .models import registry
+
+        # Index the models once for the views, urls and admin discovery.
+        registry.build()
+        class_prepared.connect(registry.model_class_prepared)
+
+        if conf.get('PRINTER_MODE') == 'instance':
+            # Explicitly connect a signal handler.
+            pre_init.connect(signals.model_pre_init)
+        else:
+            # Upgrade the printers once per model class, rather than every
+            # model instance through the global pre_init.
+            signals.install_all_printers(apps.get_models())
+            class_prepared.connect(signals.model_class_prepared)
+
+        # The cached list rows receivers connect on register; see short.fragments
+
+        # The date bucket receivers of the settings; history(rollup=True)
+        # registers on the call. See short.rollup
+        for label in conf.get('ROLLUP'):
+            rollup.register_label(label)
+
+        # Compile the templates of the generated views before the first
+        # request; see short.templatememo
+        file_changed.connect(signals.template_file_changed)
+        for name in conf.get('TEMPLATE_WARMUP'):
+            templatememo.warm(templatememo.module_views(name))
@@ -0,0 +1,347 @@
+"""
+Micro benchmarks for the short tooling. Run through the management command:
+
+    python manage.py shortbench printers --model products.Product --count 10000
+
+Each benchmark is a function registered with `@bench`, accepting the `options`
+dict from the command and returning a dict of `name: seconds` (or any value)
+results to print.
+"""
+import importlib
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from django.apps import apps
+
+
+BENCHES = {}
+
+
+def bench(func):
+    BENCHES[func.__name__.replace('bench_', '')] = func
+    return func
+
+
+def timed(func, count=1, *a, **kw):
+    """Call the `func` `count` times and return the total seconds.
+    """
+    start = time.perf_counter()
+    for i in range(count):
+        func(*a, **kw)
+    return time.perf_counter() - start
+
+
+def get_model(options, default='products.Product'):
+    return apps.get_model(options.get('model') or default)
+
+
+@bench
+def bench_printers(options):
+    """Model instantiation cost with the legacy 'instance' printer mode
+    (a global `pre_init` receiver) against the 'class' mode.
+    """
+    from django.db.models.signals import pre_init
+    from short import signals
+
+    model = get_model(options)
+    count = options.get('count') or 10_000
+
+    class_mode = timed(model, count)
+
+    pre_init.connect(signals.model_pre_init)
+    try:
+        # The legacy receiver prints for every instance.
+        with redirect_stdout(io.StringIO()):
+            instance_mode = timed(model, count)
+    finally:
+        pre_init.disconnect(signals.model_pre_init)
+
+    return {
+        'model': model.__name__,
+        'count': count,
+        'class': class_mode,
+        'instance': instance_mode,
+    }
+
+
+@bench
+def bench_json(options):
+    """Rows per second of the JsonListView serializer path against the
+    `use_values` fast path. The rows are created in a transaction and
+    rolled back.
+    """
+    from django.db import transaction
+    from short.views.serialized import JsonListView
+
+    model = get_model(options)
+    count = options.get('count') or 100_000
+
+    with transaction.atomic():
+        model.objects.bulk_create((model() for i in range(count)), batch_size=1000)
+        queryset = model.objects.all()
+
+        view = JsonListView(model=model)
+        serializer = timed(view.serialize, 1, queryset)
+
+        view = JsonListView(model=model, use_values=True)
+        values = timed(view.serialize, 1, queryset)
+
+        transaction.set_rollback(True)
+
+    return {
+        'model': model.__name__,
+        'count': count,
+        'serializer': serializer,
+        'serializer rows/sec': int(count / serializer),
+        'values': values,
+        'values rows/sec': int(count / values),
+    }
+
+
+@bench
+def bench_startup(options):
+    """Import time of the `{app}.views` and `{app}.urls` modules, with
+    eager and lazy view generation. Each import is repeated `count`
+    times, keeping the fastest.
+    """
+    from django.test import override_settings
+
+    app = options.get('app') or 'products'
+    count = options.get('count') or 5
+    names = (f'{app}.views', f'{app}.urls',)
+    r = {}
+
+    def import_all():
+        for name in names:
+            sys.modules.pop(name, None)
+        return tuple(timed(importlib.import_module, 1, x) for x in names)
+
+    for lazy in (False, True):
+        label = 'lazy' if lazy else 'eager'
+        with override_settings(SHORT_LAZY_VIEWS=lazy), redirect_stdout(io.StringIO()):
+            results = tuple(import_all() for i in range(count))
+        views, urls = (min(x) for x in zip(*results))
+        r[f'{label} views'] = views
+        r[f'{label} urls'] = urls
+        r[f'{label} total'] = min(sum(x) for x in results)
+    return r
+
+
+@bench
+def bench_routes(options):
+    """The `{app}.urls` route building of `paths_less` against the single
+    pass `compile_routes` and `build_paths`, for the crud and history
+    views of every model in the app. Repeated `count` times.
+    """
+    from short import urls, names, grab_models
+
+    app = options.get('app') or 'products'
+    count = options.get('count') or 100
+    views = importlib.import_module(f'{app}.views')
+    models = grab_models(importlib.import_module(f'{app}.models'))
+    view_names = names.crud() + names.history()
+    patterns = {x: names.get_url(x) for x in view_names}
+
+    with redirect_stdout(io.StringIO()):
+        less = timed(urls.paths_less, count, views, models,
+                     ignore_missing_views=True, **patterns)
+        compiled = timed(urls.paths_default, count, views, models, views=view_names)
+
+    return {
+        'routes': len(urls.compile_routes(views, models, views=view_names)),
+        'count': count,
+        'paths_less': less,
+        'compiled': compiled,
+        'compile_routes (last)': urls.timings['compile_routes'],
+        'build_paths (last)': urls.timings['build_paths'],
+    }
+
+
+@bench
+def bench_resolver(options):
+    """Resolve time of a flat list of the generated patterns against the
+    `TrieResolver`; `--count` models (default 50) of the 12 crud and
+    history views. Each url is resolved 1000 times.
+    """
+    from django.http import HttpResponse
+    from django.urls import Resolver404, path
+    from django.urls.resolvers import URLResolver, RoutePattern
+    from short import names
+    from short.resolvers import TrieResolver
+
+    count = options.get('count') or 50
+    view_names = names.crud() + names.history()
+
+    def view(request, *a, **kw):
+        return HttpResponse()
+
+    patterns = [
+        path(f'model{i}/{names.get_url(x)}', view, name=f'model{i}-{x}')
+        for i in range(count)
+        for x in view_names
+    ]
+    flat = URLResolver(RoutePattern(''), patterns)
+    trie = TrieResolver(patterns)
+
+    last = f'model{count - 1}'
+    urls = {
+        'first list': 'model0/list/',
+        'last detail': f'{last}/detail/42/',
+        'last datedetail': f'{last}/2021/jan/12/42/',
+        'unmatched': 'nothing/here/',
+    }
+
+    def resolve(resolver, url):
+        try:
+            resolver.resolve(url)
+        except Resolver404:
+            pass
+
+    r = {'patterns': len(patterns)}
+    for label, url in urls.items():
+        r[f'flat {label}'] = timed(resolve, 1000, flat, url)
+        r[f'trie {label}'] = timed(resolve, 1000, trie, url)
+    return r
+
+
+@bench
+def bench_shortid(options):
+    """Insert rate of the model (through `ids.bulk_create`, batches of
+    1000) with random and monotonic short ids, and the ids/sec of each
+    generator. `--count` rows (default 1,000,000) in a rolled back
+    transaction.
+    """
+    from django.db import transaction
+    from short.models import ids
+
+    model = get_model(options)
+    count = options.get('count') or 1_000_000
+    batch = 1000
+    fields = ids.short_id_fields(model)
+    if len(fields) == 0:
+        raise ValueError(f'{model.__name__} has no ShortIdField')
+    field = fields[0]
+    original = field.generator
+    r = {'model': model.__name__, 'field': field.name, 'count': count}
+
+    def insert():
+        for i in range(0, count, batch):
+            objs = [model() for x in range(min(batch, count - i))]
+            ids.bulk_create(model, objs, batch_size=batch)
+
+    try:
+        for monotonic in (False, True):
+            label = 'monotonic' if monotonic else 'random'
+            field.generator = ids.IdGenerator(field.length, field.alphabet, monotonic)
+            generator = timed(field.generator, count)
+            r[f'{label} ids/sec'] = int(count / generator)
+            with transaction.atomic():
+                seconds = timed(insert)
+                transaction.set_rollback(True)
+            r[f'{label} insert'] = seconds
+            r[f'{label} rows/sec'] = int(count / seconds)
+    finally:
+        field.generator = original
+    return r
+
+
+@bench
+def bench_asgi(options):
+    """Requests per second of the generated list and detail views through
+    the ASGI handler, in process, with sync views against `async_views`.
+    `--count` requests (default 1000) of each view, 50 at once, reading
+    100 rows of the model in a test database.
+    """
+    import asyncio
+    import types
+    from django.core.asgi import get_asgi_application
+    from django.test import override_settings
+    from django.test.runner import DiscoverRunner
+    from django.urls import include, path, reverse
+    from short import names, urls
+    from short.views import base
+
+    model = get_model(options)
+    count = options.get('count') or 1000
+    concurrency = 50
+    app = get_asgi_application()
+
+    async def get(url):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': url, 'raw_path': url.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        }
+        sent = asyncio.Event()
+        status = []
+
+        async def receive():
+            if sent.is_set():
+                # No disconnect until the response is sent; the handler
+                # listens for one in a cancelled task.
+                await asyncio.Future()
+            sent.set()
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        await app(scope, receive, send)
+        return status[0]
+
+    async def load(url):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                return await get(url)
+
+        codes = await asyncio.gather(*(one() for i in range(count)))
+        return sum(1 for x in codes if x != 200)
+
+    def urlconf(label, async_views):
+        views = types.ModuleType(f'short_bench_{label}_views')
+        sys.modules[views.__name__] = views
+        base.crud(model, views.__name__, async_views=async_views)
+        patterns = urls.paths_default(views, [model], views=names.crud())
+        conf = types.ModuleType(f'short_bench_{label}_urls')
+        appname = base.extract_location(model)[0]
+        conf.urlpatterns = [path('', include((patterns, appname)))]
+        sys.modules[conf.__name__] = conf
+        return conf.__name__
+
+    runner = DiscoverRunner(verbosity=0)
+    with redirect_stdout(io.StringIO()):
+        old_config = runner.setup_databases()
+    r = {'model': model.__name__, 'count': count, 'concurrency': concurrency}
+    try:
+        model.objects.bulk_create(model() for i in range(100))
+        pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+        appname, mod_first, _ = base.extract_location(model)
+        for label, async_views in (('sync', False), ('async', True)):
+            with redirect_stdout(io.StringIO()):
+                root = urlconf(label, async_views)
+            with override_settings(ROOT_URLCONF=root):
+                targets = {
+                    'list': reverse(f'{appname}:{mod_first}-list'),
+                    'detail': reverse(f'{appname}:{mod_first}-detail', args=(pk,)),
+                }
+                for name, url in targets.items():
+                    start = time.perf_counter()
+                    errors = asyncio.run(load(url))
+                    seconds = time.perf_counter() - start
+                    r[f'{label} {name}'] = seconds
+                    r[f'{label} {name} requests/sec'] = int(count / seconds)
+                    if errors > 0:
+                        r[f'{label} {name} errors'] = errors
+    finally:
+        runner.teardown_databases(old_config)
+    return r
+
+
+def run(name, options):
+    return BENCHES[name](options)
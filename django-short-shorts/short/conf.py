@@ -0,0 +1,40 @@
+"""
+Short settings, read from the django `settings` with a `SHORT_` prefix:
+
+    # settings.py
+    SHORT_PRINTER_MODE = 'instance'
+
+Any missing setting falls back to the value in `DEFAULTS`:
+
+    from short import conf
+    conf.get('PRINTER_MODE') # 'class'
+"""
+from django.conf import settings
+
+
+DEFAULTS = {
+    # 'class': install the __str__/__repr__ printers once per model class.
+    # 'instance': legacy; inspect every model instance through `pre_init`.
+    'PRINTER_MODE': 'class',
+    # Generate the crud_classes/history_classes views on first access.
+    'LAZY_VIEWS': False,
+    # A directory to store the paths_default route tables, for warm starts.
+    'ROUTE_SNAPSHOT': None,
+    # Resolve the paths_default urls through a short.resolvers.TrieResolver.
+    'TRIE_RESOLVER': False,
+    # "app_label.Model.date_field" rollup buckets to keep; see short.rollup
+    'ROLLUP': (),
+    # Record the time, queries and size of each generated view request; or
+    # view_stats=True of a class definition. See short.stats
+    'VIEW_STATS': False,
+    # The functions given each view request sample; see short.stats
+    'STATS_SINKS': ('short.stats.memory_sink',),
+    # The views modules to compile the templates of on ready; see short.templatememo
+    'TEMPLATE_WARMUP': (),
+}
+
+
+def get(name, default=None):
+    if default is None:
+        default = DEFAULTS.get(name, None)
+    return getattr(settings, f'SHORT_{name}', default)
@@ -1,6 +1,43 @@
 # from django.core.urlresolvers import resolve
-from django.urls import resolve
+from functools import lru_cache
+
+from django.core.signals import setting_changed
+from django.urls import Resolver404, resolve
+from django.utils.functional import lazy
 
 
 def appname(request):
-    return {'appname': resolve(request.path).app_name}
+    """The `appname` of the resolved request url. The value is lazy; a
+    template without `appname` costs nothing.
+    """
+    return {'appname': lazy_appname(request)}
+
+
+def get_appname(request):
+    """Return the app_name of the `request.resolver_match` Django already
+    resolved, else resolve the path through an LRU cache (such as on error
+    pages).
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.app_name
+    return resolve_appname(request.path_info, getattr(request, 'urlconf', None))
+
+
+@lru_cache(maxsize=1024)
+def resolve_appname(path, urlconf=None):
+    try:
+        return resolve(path, urlconf).app_name
+    except Resolver404:
+        return ''
+
+
+lazy_appname = lazy(get_appname, str)
+
+
+def urlconf_changed(setting, **kw):
+    if setting == 'ROOT_URLCONF':
+        resolve_appname.cache_clear()
+
+
+setting_changed.connect(urlconf_changed)
@@ -0,0 +1,94 @@
+"""
+A cache of the archive view date lists and their row counts, keyed by the
+model, `date_field`, period and range of the list:
+
+    shorts.history(models.Product, date_cache='default', date_cache_timeout=300)
+
+The archive views with a `date_cache` alias cache their date list for the
+timeout; the default `date_cache=None` caches nothing. The lists of a model
+date field are invalidated together (by a key generation) when a row is
+created or deleted, or saved with the date field in its `update_fields`
+(or without `update_fields`), by the receivers in `short.signals`. The bulk
+views of `shorts.crud` invalidate through `invalidate_fields`; other bulk
+writes send no signals and are seen after the timeout.
+"""
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
+
+from .fragments import bump_generation, read_generation
+
+
+## model class: {date field name: set of cache aliases}
+_registry = {}
+
+
+def register(model, date_field='created', alias='default'):
+    _registry.setdefault(model, {}).setdefault(date_field, set()).add(alias)
+    connect(model)
+
+
+def unregister(model, date_field='created'):
+    fields = _registry.get(model, {})
+    fields.pop(date_field, None)
+    if len(fields) == 0:
+        _registry.pop(model, None)
+        disconnect(model)
+
+
+def connect(model):
+    from . import signals
+
+    uid = f'short.datecache:{model._meta.label_lower}'
+    post_save.connect(signals.date_cache_post_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(signals.date_cache_post_delete, sender=model, dispatch_uid=uid)
+
+
+def disconnect(model):
+    uid = f'short.datecache:{model._meta.label_lower}'
+    for signal in (post_save, post_delete,):
+        signal.disconnect(sender=model, dispatch_uid=uid)
+
+
+def registered_fields(model):
+    return _registry.get(model, {})
+
+
+def generation_key(model, date_field):
+    return f'short:dates:{model._meta.label_lower}:{date_field}:gen'
+
+
+def list_key(model, date_field, generation, *parts):
+    tail = ':'.join(str(x) for x in parts)
+    return f'short:dates:{model._meta.label_lower}:{date_field}:{generation}:{tail}'
+
+
+def get_generation(cache, model, date_field):
+    return read_generation(cache, generation_key(model, date_field))
+
+
+def invalidate(model, date_field):
+    """Drop every cached date list of the model date field."""
+    for alias in _registry.get(model, {}).get(date_field, ()):
+        bump_generation(caches[alias], generation_key(model, date_field))
+
+
+def invalidate_fields(model, names=None):
+    """Drop the date lists of each registered date field of the model, or
+    of the fields in `names`.
+    """
+    for date_field in tuple(registered_fields(model)):
+        if names is None or date_field in names:
+            invalidate(model, date_field)
+
+
+def get(alias, model, date_field, parts):
+    """Return the cached value of the date list `parts` (a tuple of the
+    period, range, ordering and time zone), and the key to `store` on a miss.
+    """
+    cache = caches[alias]
+    key = list_key(model, date_field, get_generation(cache, model, date_field), *parts)
+    return (cache.get(key), key,)
+
+
+def store(alias, key, value, timeout=None):
+    caches[alias].set(key, value, timeout)
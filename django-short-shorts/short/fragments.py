@@ -0,0 +1,148 @@
+"""
+A cache of rendered list row fragments, keyed by `(model, pk, updated)`.
+
+Enable for a generated ListView with the name of a django cache alias:
+
+    shorts.crud_classes(row_cache='default')
+
+The `short/crud/list.html` renders each row through `{% short_row item %}`,
+re-rendering only the rows not in the cache or changed since. The rows are
+invalidated by the `post_save`, `post_delete` and `m2m_changed` receivers in
+`short.signals`, connected for the registered models (and their m2m
+`through` models) only. A row template receives the `item`, `appname` and
+`model_name` only.
+"""
+import time
+
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils.safestring import mark_safe
+
+
+## model class: set of cache aliases
+_registry = {}
+
+
+def register(model, alias='default'):
+    _registry.setdefault(model, set()).add(alias)
+    connect(model)
+
+
+def connect(model):
+    """Connect the invalidation receivers of `short.signals` for the model
+    and its m2m `through` models only; other models keep the fast (signal
+    free) bulk deletes.
+    """
+    from . import signals
+
+    uid = f'short.fragments:{model._meta.label_lower}'
+    post_save.connect(signals.row_cache_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(signals.row_cache_changed, sender=model, dispatch_uid=uid)
+
+    for through in m2m_throughs(model):
+        m2m_changed.connect(signals.row_cache_m2m_changed, sender=through,
+                            dispatch_uid=f'{uid}:{through._meta.label_lower}')
+
+
+def m2m_throughs(model):
+    """Return the `through` models of the m2m relations from and to the
+    model.
+    """
+    r = {}
+    for field in model._meta.get_fields(include_hidden=True):
+        if field.many_to_many:
+            # The field or the reverse ManyToManyRel
+            through = getattr(field, 'through', None) or field.remote_field.through
+            r[through] = None
+    return tuple(r)
+
+
+def is_registered(model):
+    return model in _registry
+
+
+def generation_key(model):
+    return f'short:row:{model._meta.label_lower}:gen'
+
+
+def row_key(model, generation, pk):
+    return f'short:row:{model._meta.label_lower}:{generation}:{pk}'
+
+
+def read_generation(cache, key):
+    """Return the key generation, created without a timeout. A missing (or
+    evicted) generation starts from the clock, never from a value a stale
+    entry may still carry.
+    """
+    generation = cache.get(key)
+    if generation is None:
+        generation = time.time_ns()
+        if cache.add(key, generation, None) is False:
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_generation(cache, key):
+    """Move the key generation past every entry cached so far."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def get_generation(cache, model):
+    return read_generation(cache, generation_key(model))
+
+
+def invalidate(model, pks=None):
+    """Delete the cached rows for the model `pks`. If `pks` is `None`, all
+    rows of the model are dropped by bumping the key generation.
+    """
+    for alias in _registry.get(model, ()):
+        cache = caches[alias]
+        if pks is None:
+            bump_generation(cache, generation_key(model))
+            continue
+
+        generation = get_generation(cache, model)
+        cache.delete_many([row_key(model, generation, pk) for pk in pks])
+
+
+class RowCache:
+    """Rendered rows for one page of a list; The cached rows of the page
+    are read with one `get_many` on the first render.
+    """
+
+    def __init__(self, model, alias='default', updated_field='updated', object_list=()):
+        self.model = model
+        self.cache = caches[alias]
+        self.updated_field = updated_field
+        self.object_list = object_list
+        self.generation = None
+        self.rows = None
+
+    def key(self, pk):
+        return row_key(self.model, self.generation, pk)
+
+    def load(self):
+        self.generation = get_generation(self.cache, self.model)
+        keys = [self.key(x.pk) for x in self.object_list]
+        self.rows = self.cache.get_many(keys)
+
+    def render(self, item, variant, render_func):
+        """Return the cached html for the item, or call the `render_func`
+        and store the result. The `variant` (such as the template and
+        appname) must match the cached row.
+        """
+        if self.rows is None:
+            self.load()
+
+        key = self.key(item.pk)
+        updated = getattr(item, self.updated_field or '', None)
+        cached = self.rows.get(key)
+        if cached is not None and cached[0] == updated and cached[1] == variant:
+            return mark_safe(cached[2])
+
+        html = render_func()
+        self.cache.set(key, (updated, variant, str(html),))
+        return mark_safe(html)
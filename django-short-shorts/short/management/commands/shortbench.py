@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from short import bench
+
+
+class Command(BaseCommand):
+    help = 'Run a short micro benchmark, such as "printers".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(bench.BENCHES))
+        parser.add_argument('--model', default=None,
+            help='The "app_label.Model" to test, such as "products.Product"')
+        parser.add_argument('--count', type=int, default=None)
+        parser.add_argument('--app', default=None,
+            help='The app module to test, such as "products"')
+
+    def handle(self, *args, **options):
+        results = bench.run(options['name'], options)
+        for key, value in results.items():
+            if isinstance(value, float):
+                value = f'{value:.4f}s'
+            self.stdout.write(f'{key}: {value}')
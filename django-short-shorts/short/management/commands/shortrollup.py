@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from short import rollup
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the short.rollup date buckets of "app_label.Model.date_field" labels,'
+            ' or of every registered model date field.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('labels', nargs='*',
+            help='Such as "products.Product.created"')
+
+    def handle(self, *args, **options):
+        pairs = ()
+        for label in options['labels']:
+            try:
+                model_label, date_field = label.rsplit('.', 1)
+                pairs += ((apps.get_model(model_label), date_field,),)
+            except (ValueError, LookupError) as e:
+                raise CommandError(f'Unknown label "{label}": {e}')
+
+        if len(pairs) == 0:
+            pairs = rollup.registered()
+
+        for model, date_field in pairs:
+            count = rollup.rebuild(model, date_field)
+            self.stdout.write(f'{model._meta.label}.{date_field}: {count} buckets')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from short import stats
+
+
+class Command(BaseCommand):
+    help = ('Request the urls through the test client and print the short.stats of each'
+            ' generated view, slowest first.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+',
+            help='Such as "/products/product/list/"')
+        parser.add_argument('--count', type=int, default=10,
+            help='The GET requests of each url')
+        parser.add_argument('--prometheus', action='store_true',
+            help='Print the Prometheus text format')
+
+    def handle(self, *args, **options):
+        if stats.memory_sink not in stats.get_sinks():
+            raise CommandError('The short.stats.memory_sink is not in SHORT_STATS_SINKS')
+
+        stats.reset()
+        client = Client()
+        for url in options['urls']:
+            for i in range(options['count']):
+                client.get(url)
+
+        if options['prometheus']:
+            self.stdout.write(stats.prometheus_text(), ending='')
+            return
+
+        self.stdout.write(f'{"view":<48} {"requests":>8} {"mean ms":>8} {"max ms":>8}'
+                          f' {"queries":>8} {"db ms":>8} {"render ms":>9} {"bytes":>9}')
+        for row in stats.snapshot():
+            self.stdout.write(f'{row.name:<48} {row.requests:>8}'
+                              f' {row["wall"].mean() * 1000:>8.2f}'
+                              f' {row["wall"].max * 1000:>8.2f}'
+                              f' {row["queries"].mean():>8.1f}'
+                              f' {row["query_time"].mean() * 1000:>8.2f}'
+                              f' {row["render"].mean() * 1000:>9.2f}'
+                              f' {row["size"].mean():>9.0f}')
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from short import templatememo
+
+
+class Command(BaseCommand):
+    help = ('Resolve and compile the templates of the generated views of the urlconf,'
+            ' or of the given views modules.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*',
+            help='Such as "products.views"')
+
+    def handle(self, *args, **options):
+        view_classes = ()
+        for name in options['modules']:
+            view_classes += templatememo.module_views(name)
+        if len(options['modules']) == 0:
+            view_classes = templatememo.urlconf_views()
+
+        start = time.perf_counter()
+        resolved = templatememo.warm(view_classes)
+        seconds = time.perf_counter() - start
+
+        missing = 0
+        for view_class, template in resolved.items():
+            name = f'{view_class.__module__}.{view_class.__name__}'
+            if template is None:
+                missing += 1
+                self.stderr.write(f'{name}: no template')
+                continue
+            self.stdout.write(f'{name}: {template.origin.template_name}')
+        self.stdout.write(f'{len(resolved)} views, {len(templatememo._templates)} templates,'
+                          f' {missing} missing, {seconds:.4f}s')
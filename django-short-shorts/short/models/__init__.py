@@ -1,2 +1,4 @@
 from .fields import *
 from .base import *
+from .ids import ShortIdField, ShortIdMixin
+from . import indexes
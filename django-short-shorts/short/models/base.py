@@ -1,27 +1,12 @@
 # from django.db import models
 
 # Create your models here.
-from django.db import models as django_models
-import inspect
-
-def is_model(name, unit):
-    if name.startswith('__'):
-        return False
-
-    if inspect.isclass(unit):
-        return django_models.Model in inspect.getmro(unit)
-
-    return False
+from . import registry
 
 
 def grab_models(_models, ignore=None):
-    ignore = ignore or ()
-    items = ()
-    for name in dir(_models):
-        unit = getattr(_models, name)
-        if (name in ignore) or (unit in ignore):
-            continue
-
-        if is_model(name, unit):
-            items += (unit, )
-    return items
+    """Return the model classes of the module, such as `grab_models(models)`.
+    The installed models modules are read from the `short.models.registry`
+    index.
+    """
+    return registry.module_models(_models, ignore=ignore)
@@ -1,5 +1,6 @@
 from django.db import models
 from short import rand
+from . import ids, indexes
 
 def defaults(args, params, nil_sub=True, nil_key='nil', **kw):
 
@@ -56,8 +57,15 @@ def text(*a, **kw):
 
 
 def chars(first_var=None, *a, **kw):
+    """A CharField of 255 blank and null characters. Given `index=True` an
+    indexed field, or a field name (or names) a composite index of both:
+
+        name = shorts.chars(index=True)
+        name = shorts.chars(index=('-count',))
+
+    See short.models.indexes
     """
-    """
+    hint = indexes.index_option(kw)
 
     # Rearrange the params, if the first var is callable, it's the default func,
     # if an int, it's the max_length
@@ -89,13 +97,28 @@ def chars(first_var=None, *a, **kw):
         max_length = default_max_length
 
     kw = defaults(a, kw, max_length=max_length, nil=True)
-    return models.CharField(*a,**kw)
+    return indexes.hint(models.CharField(*a,**kw), hint)
 
 
 def rand_str(*a, **kw):
     kw = defaults(a, kw, default=rand.rand_str)
     return chars(*a, **kw)
 
+
+def short_id(length=12, *a, monotonic=False, **kw):
+    """A unique (indexed) CharField of a generated id, such as "7QZ3K0M1X8AF".
+
+        class Product(shorts.ShortIdMixin, models.Model):
+            unique_id = shorts.short_id()
+            order_id = shorts.short_id(16, monotonic=True)
+
+    An empty id is generated on save and bulk_create. With `monotonic=True`
+    the ids start with the time, keeping new rows at the end of the index.
+    A `ShortIdMixin` model retries the save with a new id on a collision.
+    See short.models.ids
+    """
+    return ids.ShortIdField(*a, length=length, monotonic=monotonic, **kw)
+
 # def text(*args, **kw):
 #     """
 #     """
@@ -137,8 +160,10 @@ def boolean(*a, **kw):
 
     The default form widget for this field is CheckboxInput, or NullBooleanSelect if null=True.
     The default value of BooleanField is None when Field.default isn’t defined.
+    Accepts the `index` option of `chars`.
     """
-    return models.BooleanField(*a, **kw)
+    hint = indexes.index_option(kw)
+    return indexes.hint(models.BooleanField(*a, **kw), hint)
 
 
 def blank_dt(*a, **kw):
@@ -152,11 +177,13 @@ def blank_dt(*a, **kw):
 
 
 def date(*a, **kw):
-    return models.DateField(*a, **kw)
+    hint = indexes.index_option(kw)
+    return indexes.hint(models.DateField(*a, **kw), hint)
 
 
 def dt_created(*a, **kw):
-    """
+    """A DateTimeField set on create. Index the field for the archive
+    (history) views with `shorts.dt_created(index=True)`.
     """
     kw.setdefault('auto_now_add', True)
     return datetime(*a, **kw)
@@ -170,12 +197,15 @@ def dt_updated(*a, **kw):
 
 
 def datetime(*a, **kw):
-    return models.DateTimeField(*a, **kw)
+    hint = indexes.index_option(kw)
+    return indexes.hint(models.DateTimeField(*a, **kw), hint)
 
 
 def integer(*a, **kw):
+    """An IntegerField, of which the first argument is the default.
+    Accepts the `index` option of `chars`.
     """
-    """
+    hint = indexes.index_option(kw)
     value = None
     if len(a) > 0:
         value = a[0]
@@ -183,7 +213,7 @@ def integer(*a, **kw):
 
     if value is not None:
         kw.setdefault('default', value)
-    return models.IntegerField(*a, **kw)
+    return indexes.hint(models.IntegerField(*a, **kw), hint)
 
 from django.contrib.auth import get_user_model as orig_get_user_model
 
@@ -0,0 +1,256 @@
+"""
+Unique short ids, such as `"7QZ3K0M1X8AF"`, for a unique (indexed) char field:
+
+    class Product(ShortIdMixin, models.Model):
+        unique_id = shorts.short_id()
+        order_id = shorts.short_id(12, monotonic=True)
+
+An empty value is generated on save, and on `bulk_create`. The ids are read
+from a pool of random bytes generated in bulk for the process. With
+`monotonic=True` the first 8 characters are the time in milliseconds, so new
+ids sort after older ids and inserts land at the end of the index.
+
+A `ShortIdMixin` model saves again with new ids on a unique violation of a
+generated id column (a collision); `bulk_create` does the same for many
+objects. Other integrity errors raise:
+
+    from short.models import ids
+    ids.bulk_create(Product, [Product(name=x) for x in names])
+"""
+import os
+import re
+import string
+import time
+import threading
+
+from django.db import IntegrityError, connections, models, router, transaction
+
+
+## The default alphabet; ASCII ordered, so monotonic ids sort by time.
+ALPHABET = string.digits + string.ascii_uppercase
+
+## The characters of the monotonic time prefix; 36 ** 8 milliseconds is ~89 years.
+TIME_LENGTH = 8
+
+
+class IdGenerator:
+    """Return ids of `length` characters of the `alphabet` on call, taken
+    from a pool of `pool_size` ids generated at once. The pool is dropped
+    in a forked process, so workers never share ids.
+    """
+
+    def __init__(self, length=12, alphabet=ALPHABET, monotonic=False, pool_size=1024):
+        if monotonic and length <= TIME_LENGTH:
+            raise ValueError(f'A monotonic id needs more than {TIME_LENGTH} characters')
+        self.length = length
+        self.alphabet = alphabet
+        self.monotonic = monotonic
+        self.pool_size = pool_size
+        self.random_length = length - TIME_LENGTH if monotonic else length
+
+        # Map each byte to a character; The remainder bytes are dropped
+        # to keep an even distribution.
+        size = len(alphabet)
+        limit = 256 - (256 % size)
+        self.table = bytes(ord(alphabet[i % size]) for i in range(256))
+        self.drop = bytes(range(limit, 256))
+
+        self.pool = []
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def random_chars(self, count):
+        r = b''
+        while len(r) < count:
+            more = os.urandom(count - len(r) + (count >> 3) + 8)
+            r += more.translate(self.table, self.drop)
+        return r[:count].decode('ascii')
+
+    def fill(self):
+        size = self.random_length
+        chars = self.random_chars(size * self.pool_size)
+        self.pool = [chars[i:i + size] for i in range(0, len(chars), size)]
+        self.pid = os.getpid()
+
+    def time_prefix(self):
+        value = time.time_ns() // 1_000_000
+        size = len(self.alphabet)
+        r = []
+        for i in range(TIME_LENGTH):
+            value, rem = divmod(value, size)
+            r.append(self.alphabet[rem])
+        return ''.join(reversed(r))
+
+    def __call__(self):
+        with self.lock:
+            if len(self.pool) == 0 or self.pid != os.getpid():
+                self.fill()
+            value = self.pool.pop()
+        if self.monotonic:
+            return f'{self.time_prefix()}{value}'
+        return value
+
+    def many(self, count):
+        """Return a list of `count` ids."""
+        return [self() for i in range(count)]
+
+
+class ShortIdField(models.CharField):
+    """A unique `CharField` of a generated id, if empty on save. Not in
+    model forms unless `editable=True`.
+    """
+    description = 'A unique generated short id'
+
+    def __init__(self, *a, length=12, monotonic=False, alphabet=ALPHABET, **kw):
+        self.length = length
+        self.monotonic = monotonic
+        self.alphabet = alphabet
+        kw.setdefault('max_length', length)
+        kw.setdefault('unique', True)
+        kw.setdefault('blank', True)
+        kw.setdefault('editable', False)
+        super().__init__(*a, **kw)
+        self.generator = IdGenerator(length, alphabet, monotonic)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.length != 12:
+            kwargs['length'] = self.length
+        if self.monotonic:
+            kwargs['monotonic'] = True
+        if self.alphabet != ALPHABET:
+            kwargs['alphabet'] = self.alphabet
+        if kwargs.get('max_length') == self.length:
+            del kwargs['max_length']
+        if kwargs.get('unique') is True:
+            del kwargs['unique']
+        for key, default in (('blank', True,), ('editable', False,),):
+            if kwargs.get(key, not default) == default:
+                kwargs.pop(key, None)
+            else:
+                kwargs[key] = not default
+        return name, path, args, kwargs
+
+    def generate(self, instance):
+        """Set a new id on the instance if empty, returning True if set.
+        """
+        if getattr(instance, self.attname):
+            return False
+        setattr(instance, self.attname, self.generator())
+        return True
+
+    def pre_save(self, instance, add):
+        if add:
+            self.generate(instance)
+        return super().pre_save(instance, add)
+
+
+def short_id_fields(model):
+    return tuple(f for f in model._meta.concrete_fields if isinstance(f, ShortIdField))
+
+
+def generate(instance):
+    """Generate the empty ids of the instance; return the fields set.
+    """
+    return tuple(f for f in short_id_fields(instance.__class__) if f.generate(instance))
+
+
+def clear(instance, fields):
+    for f in fields:
+        setattr(instance, f.attname, '')
+
+
+## The database vendors rolling back only the failed statement of a
+## transaction; a single insert retries there without a savepoint.
+STATEMENT_ROLLBACK = ('sqlite', 'mysql', 'oracle',)
+
+UNIQUE_ERROR = re.compile(r'\bunique\b|\bduplicate\b', re.IGNORECASE)
+
+
+def is_collision(error, fields):
+    """Return `True` if the `IntegrityError` is a unique violation naming
+    the column of one of the `fields`, such as
+    `"UNIQUE constraint failed: products_product.unique_id"` or
+    `"Key (unique_id)=(...) already exists"`.
+    """
+    message = str(error)
+    if UNIQUE_ERROR.search(message) is None:
+        return False
+    return any(re.search(rf'\b{re.escape(f.column)}\b', message) for f in fields)
+
+
+def retrying(func, using, retries, fields, single=False):
+    """Call the `func` up to `retries` times while it raises an
+    `IntegrityError` of a collision of the `fields` ids. The `func`
+    receives the attempt number, to generate new ids.
+
+    In a transaction the `func` runs in a savepoint, unless it is a
+    `single` insert on a database rolling back only the failed statement.
+    """
+    connection = connections[using]
+    atomic = connection.in_atomic_block
+    savepoint = atomic and (single is False or connection.vendor not in STATEMENT_ROLLBACK)
+    for attempt in range(retries):
+        try:
+            if savepoint:
+                with transaction.atomic(using=using):
+                    return func(attempt)
+            return func(attempt)
+        except IntegrityError as e:
+            if attempt == retries - 1 or is_collision(e, fields) is False:
+                raise
+            if atomic and savepoint is False:
+                # Only the failed insert was rolled back.
+                transaction.set_rollback(False, using=using)
+
+
+class ShortIdMixin:
+    """A model mixin, saving again with new ids if an insert of a generated
+    `ShortIdField` id violates its unique constraint.
+    """
+    short_id_retries = 3
+
+    def save(self, *a, **kw):
+        if self._state.adding is False:
+            return super().save(*a, **kw)
+
+        generated = generate(self)
+        if len(generated) == 0:
+            return super().save(*a, **kw)
+
+        def save(attempt):
+            if attempt > 0:
+                clear(self, generated)
+                generate(self)
+            return super(ShortIdMixin, self).save(*a, **kw)
+
+        using = kw.get('using') or router.db_for_write(self.__class__, instance=self)
+        # A model with parents inserts a row for each.
+        single = len(self._meta.parents) == 0
+        return retrying(save, using, self.short_id_retries, generated, single)
+
+
+def bulk_create(model, objs, batch_size=None, retries=3, **kw):
+    """The `model.objects.bulk_create(objs)`, inserting all again with new
+    ids on a collision.
+    """
+    objs = list(objs)
+    generated = [generate(x) for x in objs]
+    no_pk = [x for x in objs if x.pk is None]
+
+    def create(attempt):
+        if attempt > 0:
+            # The failed insert is rolled back; drop any pks it gave.
+            for obj in no_pk:
+                obj.pk = None
+            for obj, fields in zip(objs, generated):
+                clear(obj, fields)
+                generate(obj)
+        return model._default_manager.bulk_create(objs, batch_size=batch_size, **kw)
+
+    fields = set(f for x in generated for f in x)
+    if not fields:
+        # No generated ids, no collision to retry.
+        return create(0)
+    using = router.db_for_write(model)
+    return retrying(create, using, retries, fields)
@@ -0,0 +1,123 @@
+"""
+Index hints of the field helpers. An `index=True` helper is a single column
+index (`db_index`); a field name, or tuple of names, is a composite index
+starting with the field, collected into the model `Meta.indexes`:
+
+    class Product(models.Model):
+        created = shorts.dt_created(index=True)
+        updated = shorts.dt_updated(index=('-count',))
+        count = shorts.integer(1)
+
+    Product._meta.indexes
+    [<Index: fields=['updated', '-count'] name='products_pr_updated_2c41b1_idx'>]
+
+Name the field in the tuple to choose its place or order, such as
+`index=('name', '-updated')`. The indexes are declared as each model class
+is prepared, so `makemigrations` writes them as any `Meta.indexes`.
+"""
+from django.db import models
+from django.db.models.signals import class_prepared
+
+
+## The attribute of the composite index hints on a field.
+HINT_ATTR = 'short_index_hints'
+
+
+class UnindexedWarning(UserWarning):
+    pass
+
+
+def index_option(kw):
+    """Pop the `index` option of the helper keywords; set `db_index` if
+    `True` and return a composite hint tuple, else `None`.
+    """
+    index = kw.pop('index', None)
+    if index is None or index is False:
+        return None
+    if index is True:
+        kw['db_index'] = True
+        return None
+    if isinstance(index, str):
+        index = (index,)
+    return tuple(index)
+
+
+def hint(field, fields=None):
+    """Add a composite index hint of the `fields` to the field, returning
+    the field.
+    """
+    if fields:
+        setattr(field, HINT_ATTR, getattr(field, HINT_ATTR, ()) + (tuple(fields),))
+    return field
+
+
+def index_fields(field, fields):
+    """Return the index field names of the hint, with the field first unless
+    named in the hint.
+    """
+    if field.name in (x.lstrip('-') for x in fields):
+        return tuple(fields)
+    return (field.name,) + tuple(fields)
+
+
+def declare(model):
+    """Append an index to the model `Meta.indexes` for each hint of its
+    fields, unless an index of the same fields exists. Return the tuple of
+    new indexes.
+    """
+    if model._meta.abstract:
+        return ()
+
+    existing = {tuple(x.fields) for x in model._meta.indexes}
+    r = ()
+    for field in model._meta.local_fields:
+        for fields in getattr(field, HINT_ATTR, ()):
+            fields = index_fields(field, fields)
+            if fields in existing:
+                continue
+            index = models.Index(fields=list(fields))
+            index.set_name_with_model(model)
+            existing.add(fields)
+            r += (index,)
+
+    if len(r) > 0:
+        # A new list; the Meta list may be shared with a parent class.
+        model._meta.indexes = list(model._meta.indexes) + list(r)
+        model._meta.original_attrs['indexes'] = model._meta.indexes
+    return r
+
+
+def declare_all(model_list):
+    r = ()
+    for model in model_list:
+        r += declare(model)
+    return r
+
+
+def model_class_prepared(sender, **kwargs):
+    declare(sender)
+
+
+def is_indexed(model, name):
+    """True if the field `name` is the first column of an index (or a unique
+    constraint) of the model.
+    """
+    field = model._meta.get_field(name)
+    if field.primary_key or field.unique or field.db_index:
+        return True
+
+    for index in model._meta.indexes:
+        if len(index.fields) > 0 and index.fields[0].lstrip('-') == name:
+            return True
+    for fields in model._meta.unique_together:
+        if fields[0] == name:
+            return True
+    for constraint in model._meta.constraints:
+        fields = getattr(constraint, 'fields', ())
+        if len(fields) > 0 and fields[0] == name:
+            return True
+    return False
+
+
+# Connected on import; the helpers are imported before any models module.
+class_prepared.connect(model_class_prepared, dispatch_uid='short.models.indexes')
@@ -0,0 +1,139 @@
+"""
+A process wide index of the models, built once from the django app registry
+when the `short` app is ready. The model discovery of the views, urls and
+admin read the index rather than walking the modules again:
+
+    from short.models import registry
+
+    registry.models_for_module('products.models') # (Hyperlink, Location, Product,)
+    registry.models_for_label('products')
+    registry.models_for_package('products')
+    registry.get_model('products.Product')
+
+Any model class prepared after the build clears the index, to rebuild on the
+next lookup.
+"""
+from django.apps import apps
+from django.db import models as django_models
+
+
+## The index, populated by `build()`
+_index = {}
+
+
+def is_model_class(unit):
+    return isinstance(unit, type) and issubclass(unit, django_models.Model)
+
+
+def module_pairs(module):
+    """Return a tuple of `(name, model)` pairs for the model classes of the
+    module namespace, in `dir()` order.
+    """
+    space = vars(module)
+    return tuple(
+        (name, space[name])
+        for name in sorted(space)
+        if name.startswith('__') is False and is_model_class(space[name])
+    )
+
+
+def build():
+    """Index the installed models by app label, by package (the first part
+    of the module name) and by models module.
+    """
+    by_label = {}
+    by_package = {}
+    by_module = {}
+    labels = {}
+
+    # Include the m2m `through` models, as `discover_models` always has.
+    all_models = tuple(apps.get_models(include_auto_created=True))
+    for model in all_models:
+        opts = model._meta
+        by_label.setdefault(opts.app_label, []).append(model)
+        package = model.__module__.split('.')[0]
+        by_package.setdefault(package, []).append(model)
+        labels[opts.label_lower] = model
+
+    for config in apps.get_app_configs():
+        if config.models_module is not None:
+            by_module[config.models_module.__name__] = module_pairs(config.models_module)
+
+    _index.update(
+        all_models=all_models,
+        by_label={k: tuple(v) for k, v in by_label.items()},
+        by_package={k: tuple(v) for k, v in by_package.items()},
+        by_module=by_module,
+        labels=labels,
+    )
+    return _index
+
+
+def clear(*a, **kw):
+    _index.clear()
+
+
+def get_index():
+    """Return the index, or `None` before the app registry models are
+    ready.
+    """
+    if len(_index) > 0:
+        return _index
+    if apps.models_ready is False:
+        return None
+    return build()
+
+
+def model_class_prepared(sender, **kwargs):
+    clear()
+
+
+def module_models(module, ignore=None):
+    """Return the models of the module namespace as `grab_models`, from the
+    index for an app models module, else walking the module.
+    """
+    index = get_index()
+    pairs = None
+    if index is not None:
+        pairs = index['by_module'].get(getattr(module, '__name__', None))
+    if pairs is None:
+        pairs = module_pairs(module)
+
+    ignore = ignore or ()
+    return tuple(
+        model for name, model in pairs
+        if (name in ignore) is False and (model in ignore) is False
+    )
+
+
+def models_for_module(name):
+    return tuple(m for n, m in _require()['by_module'].get(name, ()))
+
+
+def models_for_label(app_label):
+    return _require()['by_label'].get(app_label, ())
+
+
+def models_for_package(package):
+    return _require()['by_package'].get(package, ())
+
+
+def all_models():
+    return _require()['all_models']
+
+
+def get_model(label):
+    """Return the model for the "app_label.ModelName" label (any case), or
+    raise a `LookupError`.
+    """
+    try:
+        return _require()['labels'][label.lower()]
+    except KeyError:
+        raise LookupError(f'No installed model {label}')
+
+
+def _require():
+    index = get_index()
+    if index is None:
+        apps.check_models_ready()
+    return index
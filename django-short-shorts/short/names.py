@@ -9,6 +9,11 @@ VIEWS = (
     'DetailView',
     # 'DeleteViewCustomDeleteWarning',
 
+    ## bulk
+    'BulkCreateView',
+    'BulkUpdateView',
+    'BulkDeleteView',
+
     ## history
     'ArchiveIndexView',
     'DateDetailView',
@@ -37,6 +42,9 @@ VIEWS = (
 ## Order is importtant.
 url_enforcements = (
     ( ('update', 'detail', 'delete',), '{name}/<str:pk>/', ),
+    ( ('bulkcreate',), 'bulk/create/', ),
+    ( ('bulkupdate',), 'bulk/update/', ),
+    ( ('bulkdelete',), 'bulk/delete/', ),
     # ( ('archiveindex',), '', ),
     ( ('todayarchive',), 'today/', ),
     ( ('datedetail',  ), '<int:year>/<str:month>/<int:day>/<int:pk>/', ),
@@ -69,6 +77,13 @@ def crud():
         'detail',
         )
 
+def bulk():
+    return (
+        'bulkcreate',
+        'bulkupdate',
+        'bulkdelete',
+        )
+
 def history():
     # Order is important
     return (
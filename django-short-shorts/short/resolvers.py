@@ -0,0 +1,97 @@
+"""
+A resolver for the generated short urls, matching the literal segments of
+each route through a trie before any regex:
+
+    product/list/
+    product/detail/<str:pk>/
+    product/<int:year>/<str:month>/
+
+    product
+      list       -> [product/list/]
+      detail     -> [product/detail/<str:pk>/]
+      (leaf)     -> [product/<int:year>/<str:month>/, ...]
+
+A request walks the trie by its path segments. Only the routes of the nodes
+on the walk are tried, in their original order, so an unmatched or late url
+no longer tries every pattern. Reversing is unchanged.
+
+    urlpatterns = shorts.paths_default(views, grab_models(models), trie=True)
+
+    # or any list of path() entries
+    urlpatterns = shorts.trie_paths(patterns)
+"""
+from django.urls.resolvers import URLPattern, URLResolver, RoutePattern
+
+
+def literal_segments(pattern):
+    """Return a tuple of the leading literal path segments of a `path()`
+    route, such as `('product', 'detail',)` for `product/detail/<str:pk>/`.
+    Other patterns (`re_path`, locale prefixes) have none.
+    """
+    if isinstance(pattern, (URLPattern, URLResolver,)) is False:
+        return ()
+    if isinstance(pattern.pattern, RoutePattern) is False:
+        return ()
+
+    # The last part has no closing slash; it may match a longer segment.
+    parts = str(pattern.pattern).split('/')[:-1]
+    r = []
+    for part in parts:
+        if '<' in part or part == '':
+            break
+        r.append(part)
+    return tuple(r)
+
+
+class Node:
+
+    def __init__(self):
+        self.children = {}
+        self.patterns = []
+        self.resolver = None
+
+
+class TrieResolver(URLResolver):
+    """A `URLResolver` of the given patterns without a prefix or namespace,
+    resolving through a trie of the literal route segments.
+    """
+
+    def __init__(self, patterns):
+        super().__init__(RoutePattern(''), list(patterns))
+        self.root = None
+
+    def build(self):
+        root = Node()
+        for index, pattern in enumerate(self.url_patterns):
+            node = root
+            for segment in literal_segments(pattern):
+                node = node.children.setdefault(segment, Node())
+            node.patterns.append((index, pattern,))
+        self.resolve_nodes(root, ())
+        self.root = root
+        return root
+
+    def resolve_nodes(self, node, inherited):
+        """Give each node a plain resolver of its own patterns and those of
+        the parent nodes, in the original order.
+        """
+        patterns = sorted(inherited + tuple(node.patterns), key=lambda x: x[0])
+        node.resolver = URLResolver(RoutePattern(''), [x[1] for x in patterns])
+        for child in node.children.values():
+            self.resolve_nodes(child, tuple(patterns))
+
+    def get_node(self, path):
+        node = self.root or self.build()
+        for segment in path.split('/'):
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+        return node
+
+    def resolve(self, path):
+        path = str(path)  # path may be a reverse_lazy object
+        return self.get_node(path).resolver.resolve(path)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} ({len(self.url_patterns)} patterns)>'
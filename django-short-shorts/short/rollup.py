@@ -0,0 +1,265 @@
+"""
+A rollup table of row counts per model date field, for each day, week,
+month and year bucket. The generated archive views read their `date_list`
+from the buckets rather than grouping the table on every request:
+
+    shorts.history(models.Product, date_field='created', rollup=True)
+
+    # or, for processes not importing the views, in the settings.py
+    SHORT_ROLLUP = ('products.Product.created',)
+
+The buckets are kept by the `post_save` and `post_delete` receivers in
+`short.signals`, connected for the registered models only; a save costs one
+UPDATE of the four buckets. The bulk views of `shorts.crud` count their rows
+with `add_objects` and `move_objects`. `bulk_create`, `update()` and raw SQL
+send no signals; rebuild the buckets of existing or bulk written rows:
+
+    python manage.py shortrollup products.Product.created
+
+The dates are bucketed in the default time zone. A week starts on Monday.
+"""
+import datetime
+from collections import Counter
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_init, post_save, post_delete
+from django.utils import timezone
+
+
+PERIODS = ('day', 'week', 'month', 'year',)
+
+## model class: set of date field names
+_registry = {}
+
+## The instance attribute of the loaded date values, {attname: value}
+ORIGINAL_ATTR = '_short_rollup_dates'
+
+
+class DateBucket(models.Model):
+    """The count of `model` rows of the `date_field` in the bucket starting
+    at `date`.
+    """
+    model = models.CharField(max_length=100)
+    date_field = models.CharField(max_length=100)
+    period = models.CharField(max_length=5)
+    date = models.DateField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'date_field', 'period', 'date'],
+                                    name='short_datebucket_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}.{self.date_field} {self.period} {self.date}: {self.count}'
+
+
+def register(model, date_field='created'):
+    _registry.setdefault(model, set()).add(date_field)
+    connect(model)
+
+
+def register_label(label):
+    """Register a `"app_label.Model.date_field"` string, such as from the
+    `SHORT_ROLLUP` setting.
+    """
+    from django.apps import apps
+
+    model_label, date_field = label.rsplit('.', 1)
+    register(apps.get_model(model_label), date_field)
+
+
+def unregister(model, date_field='created'):
+    fields = _registry.get(model, set())
+    fields.discard(date_field)
+    if len(fields) == 0:
+        _registry.pop(model, None)
+        disconnect(model)
+
+
+def connect(model):
+    from . import signals
+
+    uid = f'short.rollup:{model._meta.label_lower}'
+    post_init.connect(signals.rollup_post_init, sender=model, dispatch_uid=uid)
+    post_save.connect(signals.rollup_post_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(signals.rollup_post_delete, sender=model, dispatch_uid=uid)
+
+
+def disconnect(model):
+    uid = f'short.rollup:{model._meta.label_lower}'
+    for signal in (post_init, post_save, post_delete,):
+        signal.disconnect(sender=model, dispatch_uid=uid)
+
+
+def is_registered(model, date_field):
+    return date_field in _registry.get(model, ())
+
+
+def registered_fields(model):
+    return _registry.get(model, ())
+
+
+def registered():
+    """Return a tuple of the registered `(model, date_field)` pairs."""
+    return tuple((model, name,) for model, names in _registry.items() for name in sorted(names))
+
+
+def bucket_date(value):
+    """Return the local `date` of a date or datetime value, or `None`."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value, timezone.get_default_timezone())
+        return value.date()
+    return value
+
+
+def period_start(date, period):
+    if period == 'day':
+        return date
+    if period == 'week':
+        return date - datetime.timedelta(days=date.weekday())
+    if period == 'month':
+        return date.replace(day=1)
+    return date.replace(month=1, day=1)
+
+
+def bucket_keys(date):
+    return tuple((period, period_start(date, period),) for period in PERIODS)
+
+
+def bucket_filter(keys):
+    q = Q()
+    for period, date in keys:
+        q |= Q(period=period, date=date)
+    return q
+
+
+def model_buckets(model, date_field):
+    return DateBucket.objects.filter(model=model._meta.label_lower, date_field=date_field)
+
+
+def add(model, date_field, date, delta=1):
+    """Add the `delta` to the four buckets of the date; one UPDATE, and an
+    INSERT for each bucket not yet counted.
+    """
+    if date is None or delta == 0:
+        return
+    keys = bucket_keys(date)
+    queryset = model_buckets(model, date_field)
+    updated = queryset.filter(bucket_filter(keys)).update(count=F('count') + delta)
+    if updated == len(keys) or delta < 0:
+        # A missing bucket of a removal was never counted; see rebuild()
+        return
+
+    existing = set(queryset.filter(bucket_filter(keys)).values_list('period', 'date'))
+    for period, start in keys:
+        if (period, start,) in existing:
+            continue
+        try:
+            with transaction.atomic():
+                DateBucket.objects.create(model=model._meta.label_lower, date_field=date_field,
+                                          period=period, date=start, count=delta)
+        except IntegrityError:
+            # Inserted by a concurrent save since.
+            queryset.filter(period=period, date=start).update(count=F('count') + delta)
+
+
+def move(model, date_field, old, new):
+    """Move a row from the buckets of the `old` date to the `new` date."""
+    if old == new:
+        return
+    add(model, date_field, old, -1)
+    add(model, date_field, new, 1)
+
+
+def object_dates(model, objects):
+    """Return a dict of `{date_field: Counter of dates}` of the registered
+    fields of the model objects.
+    """
+    r = {}
+    for name in registered_fields(model):
+        attname = model._meta.get_field(name).attname
+        r[name] = Counter(bucket_date(x.__dict__.get(attname)) for x in objects)
+    return r
+
+
+def add_dates(model, dates, sign=1):
+    """Add the counts of an `object_dates` dict to the buckets; one `add`
+    for each distinct date.
+    """
+    for date_field, counts in dates.items():
+        for date, count in counts.items():
+            add(model, date_field, date, sign * count)
+
+
+def add_objects(model, objects, sign=1):
+    """Count the (bulk written) objects in the buckets; `sign=-1` for
+    removed rows.
+    """
+    add_dates(model, object_dates(model, objects), sign)
+
+
+def move_objects(model, before, objects):
+    """Move the (bulk updated) objects from the buckets of the `before`
+    dates, an `object_dates` dict read before the change.
+    """
+    after = object_dates(model, objects)
+    for date_field, counts in after.items():
+        counts = counts.copy()
+        counts.subtract(before.get(date_field, {}))
+        add_dates(model, {date_field: counts})
+
+
+def day_counts(model, date_field):
+    """Return a dict of `{date: count}` of the model rows, grouped by the
+    database.
+    """
+    field = model._meta.get_field(date_field)
+    day = F(date_field)
+    if isinstance(field, models.DateTimeField):
+        day = TruncDate(date_field, tzinfo=timezone.get_default_timezone())
+    rows = (model._default_manager.order_by()
+            .filter(**{f'{date_field}__isnull': False})
+            .annotate(short_day=day)
+            .values('short_day')
+            .annotate(short_count=Count('pk')))
+    return {bucket_date(x['short_day']): x['short_count'] for x in rows}
+
+
+def rebuild(model, date_field):
+    """Replace the buckets of the model date field with counts of the
+    table. Return the number of buckets.
+    """
+    counts = {}
+    for date, count in day_counts(model, date_field).items():
+        for key in bucket_keys(date):
+            counts[key] = counts.get(key, 0) + count
+
+    label = model._meta.label_lower
+    buckets = [
+        DateBucket(model=label, date_field=date_field, period=period, date=date, count=count)
+        for (period, date), count in counts.items()
+    ]
+    with transaction.atomic():
+        model_buckets(model, date_field).delete()
+        DateBucket.objects.bulk_create(buckets, batch_size=500)
+    return len(buckets)
+
+
+def buckets(model, date_field, period, since=None, until=None, ordering='ASC'):
+    """Return a list of `(date, count)` of the non-empty buckets of the
+    period, from the `since` date and before the `until` date.
+    """
+    queryset = model_buckets(model, date_field).filter(period=period, count__gt=0)
+    if since is not None:
+        queryset = queryset.filter(date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(date__lt=until)
+    order = 'date' if ordering == 'ASC' else '-date'
+    return list(queryset.order_by(order).values_list('date', 'count'))
@@ -1,45 +1,177 @@
 
+from functools import lru_cache
+from operator import attrgetter
+from string import Formatter
+
 from django.db.models import Model
 
+from . import fragments, rollup, datecache
+
+
+# (model class, alts): (names, signature, plan)
+_plans = {}
+
+PLAN_ATTRS = ('_short_props', '_short_props_label', '_short_props_format',)
+
+CONVERSIONS = {'s': str, 'r': repr, 'a': ascii}
+
+## The signature value of a missing class attribute
+MISSING = object()
+
 
 def str_printer(self, alts=None):
     """Acting as a __str__ replacement. Provide a list of format strings
     as `alts`, with a natural default to '_short_string'.
     If a function exists matching the string format [get]_short_string, the function is called.
+
+    The format is resolved once per model class and cached as a "plan",
+    see `get_plan`.
     """
-    apply_label = getattr(self, '_short_props_label', True)
-    self_prop_str = '{self.%(prop)s}'
-    default_prop_format = f'%(prop)s="{self_prop_str}"' if apply_label else self_prop_str
-    prop_format = getattr(self, '_short_props_format', default_prop_format)
     alts = (alts or ()) + ('_short_string',)
-    format_str = None
+    method_name, compiled = get_plan(self.__class__, alts)
+
+    if method_name is not None:
+        # self.get_short_string()
+        format_str = getattr(self, method_name)()
+        if format_str is not None:
+            return format_str.format(self=self)
+
+    if compiled is None:
+        return Model.__str__(self)
+
+    return render_format(compiled, self)
+
+
+def get_plan(model, alts):
+    """Return the cached `(method_name, compiled)` plan for the model class
+    and alts. The plan is rebuilt if any short class attribute of the
+    `plan_names` is changed, added or removed.
+    """
+    key = (model, alts)
+    names = plan_names(alts)
+    signature = [getattr(model, x, MISSING) for x in names]
+    cached = _plans.get(key)
+    if cached is not None and cached[1] == signature:
+        return cached[2]
+
+    plan = compile_plan(model, alts)
+    _plans[key] = (names, signature, plan)
+    return plan
+
+
+@lru_cache(maxsize=None)
+def plan_names(alts):
+    """Return the class attribute names a plan for the `alts` may depend upon.
+    """
+    names = PLAN_ATTRS
+    for s in alts:
+        names += (s, f'get{s}',)
+    return names
 
-    # Grab the first (best) string format - use a get method if it exists.
-    #   self: _short_string_repr, _short_string, ...
+
+def clear_plans():
+    _plans.clear()
+    compile_format.cache_clear()
+
+
+def compile_plan(model, alts):
+    """Grab the first (best) string format - use a get method if it exists.
+        model: _short_string_repr, _short_string, ...
+
+    Return a tuple of `(method_name, compiled)`. If the `method_name` exists
+    the method is called per instance, falling back to the compiled
+    `_short_props` format if the method returns `None`.
+    """
     for s in alts:
+        if hasattr(model, f'get{s}'):
+            return (f'get{s}', compile_props(model), )
+
+        if hasattr(model, s):
+            format_str = getattr(model, s)
+            if format_str is None:
+                break
+            return (None, compile_format(format_str), )
+
+    # _short_string or other alt props are not applied.
+    return (None, compile_props(model), )
+
+
+def compile_props(model):
+    if hasattr(model, '_short_props') is False:
+        return None
+
+    apply_label = getattr(model, '_short_props_label', True)
+    self_prop_str = '{self.%(prop)s}'
+    default_prop_format = f'%(prop)s="{self_prop_str}"' if apply_label else self_prop_str
+    prop_format = getattr(model, '_short_props_format', default_prop_format)
+
+    props = model._short_props
+    if isinstance(props, (tuple, list)) is False:
+        props = (props, )
+        # If only one string, then reduce the printout "field=X",
+        # to just "X"
+        prop_format = self_prop_str
+
+    format_str = ', '.join(prop_format % {'prop':x} for x in props)
+    return compile_format(format_str)
+
+
+@lru_cache(maxsize=1024)
+def compile_format(format_str):
+    """Parse the `str.format` string into a tuple of parts:
+
+        (literal, getter, conversion, format_spec)
+
+    where the getter is an `attrgetter` for the `{self.x.y}` field. Return
+    `(format_str, parts)`; The parts are `None` if the format string is
+    not simple enough to compile, and `str.format` is used.
+    """
+    parts = ()
+    try:
+        parsed = tuple(Formatter().parse(format_str))
+    except ValueError:
+        return (format_str, None, )
+
+    for literal, field_name, spec, conversion in parsed:
+        if field_name is None:
+            parts += ((literal, None, None, None), )
+            continue
+
+        getter = compile_getter(field_name)
+        if getter is None or '{' in spec:
+            return (format_str, None, )
 
-        if hasattr(self, f'get{s}'):
-            # self.get_short_string()
-            format_str = getattr(self, f'get{s}')()
-            break
+        convert = CONVERSIONS.get(conversion)
+        parts += ((literal, getter, convert, spec), )
 
-        if hasattr(self, s):
-            format_str = getattr(self, s)
-            break
+    return (format_str, parts, )
 
-    if format_str is None:
-        # _short_string or other alt props are not applied.
-        if hasattr(self, '_short_props'):
-            props = self._short_props
-            if isinstance(props, (tuple, list)) is False:
-                props = (props, )
-                # If only one string, then reduce the printout "field=X",
-                # to just "X"
-                prop_format = self_prop_str
 
-            format_str = ', '.join(prop_format % {'prop':x} for x in props)
+def compile_getter(field_name):
+    if field_name == 'self':
+        return lambda x: x
 
-    return format_str.format(self=self)
+    if field_name.startswith('self.') is False or '[' in field_name:
+        return None
+
+    return attrgetter(field_name[len('self.'):])
+
+
+def render_format(compiled, self):
+    format_str, parts = compiled
+    if parts is None:
+        return format_str.format(self=self)
+
+    r = ''
+    for literal, getter, convert, spec in parts:
+        r += literal
+        if getter is None:
+            continue
+        value = getter(self)
+        if convert is not None:
+            value = convert(value)
+        r += format(value, spec)
+    return r
 
 
 def repr_printer(self):
@@ -48,13 +180,133 @@ def repr_printer(self):
     return f"<{cl}({self.pk}) '{str_printer(self, alts)}'>"
 
 
+def is_short_model(model):
+    return hasattr(model, '_short_string') or hasattr(model, '_short_props')
+
+
+def install_printers(model):
+    """Apply the `str_printer` and `repr_printer` to the given model class,
+    if the class defines a `_short_string` or `_short_props` and has not
+    overridden the default django `__str__` or `__repr__`.
+
+    Return `True` if the model is a short model.
+    """
+    if is_short_model(model) is False:
+        return False
+
+    if model.__str__ == Model.__str__:
+        model.__str__ = str_printer
+
+    if model.__repr__ == Model.__repr__:
+        model.__repr__ = repr_printer
+
+    return True
+
+
+def install_all_printers(models):
+    """Install the printers for every model in the given iterable, such as
+    `apps.get_models()`. Return a tuple of the upgraded models.
+    """
+    r = ()
+    for model in models:
+        if install_printers(model):
+            r += (model, )
+    return r
+
+
+def model_class_prepared(sender, **kw):
+    """A `class_prepared` receiver, installing the printers once per model
+    class; for models prepared after the `short` app is ready.
+    """
+    install_printers(sender)
+
+
 def model_pre_init(sender, args, kwargs, **kw):
-    if hasattr(sender, '_short_string') or hasattr(sender, '_short_props'):
-        print('model_pre_init', sender, kw)
-        if sender.__str__ == Model.__str__:
-            sender.__str__ = str_printer
+    """The legacy `pre_init` receiver, called for every model instance.
+    Prefer the 'class' `SHORT_PRINTER_MODE`.
+    """
+    if is_short_model(sender):
+        install_printers(sender)
+
 
-        if sender.__repr__ == Model.__repr__:
-            sender.__repr__ = repr_printer
+def row_cache_changed(sender, instance, **kw):
+    """A `post_save` and `post_delete` receiver, dropping the cached list row
+    of the instance; see `short.fragments`.
+    """
+    if fragments.is_registered(sender):
+        fragments.invalidate(sender, (instance.pk,))
+
+
+def row_cache_m2m_changed(sender, instance, action, model, pk_set, **kw):
+    """An `m2m_changed` receiver, dropping the cached rows of both sides of
+    the relation.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if fragments.is_registered(instance.__class__):
+        fragments.invalidate(instance.__class__, (instance.pk,))
+
+    if fragments.is_registered(model):
+        # A clear has no pk_set; drop all rows of the other model.
+        fragments.invalidate(model, pk_set)
 
-        # sender.__repr__ == Model.__repr__
+
+def rollup_post_init(sender, instance, **kw):
+    """A `post_init` receiver, keeping the loaded date values of the
+    rollup fields to find a changed bucket on save; see `short.rollup`.
+    """
+    values = {}
+    for name in rollup.registered_fields(sender):
+        attname = sender._meta.get_field(name).attname
+        if attname in instance.__dict__:
+            values[attname] = instance.__dict__[attname]
+    instance.__dict__[rollup.ORIGINAL_ATTR] = values
+
+
+def rollup_post_save(sender, instance, created, update_fields=None, **kw):
+    """A `post_save` receiver, counting a new row in its date buckets or
+    moving a changed row.
+    """
+    original = instance.__dict__.setdefault(rollup.ORIGINAL_ATTR, {})
+    for name in rollup.registered_fields(sender):
+        attname = sender._meta.get_field(name).attname
+        date = rollup.bucket_date(instance.__dict__.get(attname))
+        if created:
+            rollup.add(sender, name, date, 1)
+        elif update_fields is not None and name not in update_fields:
+            continue
+        elif attname in original:
+            # An unknown (deferred) original value is not saved.
+            rollup.move(sender, name, rollup.bucket_date(original[attname]), date)
+        if attname in instance.__dict__:
+            original[attname] = instance.__dict__[attname]
+
+
+def rollup_post_delete(sender, instance, **kw):
+    for name in rollup.registered_fields(sender):
+        attname = sender._meta.get_field(name).attname
+        rollup.add(sender, name, rollup.bucket_date(instance.__dict__.get(attname)), -1)
+
+
+def date_cache_post_save(sender, instance, created, update_fields=None, **kw):
+    """A `post_save` receiver, dropping the date lists of a new row, or of
+    a saved date field; see `short.datecache`.
+    """
+    for name in datecache.registered_fields(sender):
+        if created or update_fields is None or name in update_fields:
+            datecache.invalidate(sender, name)
+
+
+def date_cache_post_delete(sender, instance, **kw):
+    for name in datecache.registered_fields(sender):
+        datecache.invalidate(sender, name)
+
+
+def template_file_changed(sender, file_path, **kw):
+    """A runserver `file_changed` receiver, dropping the selected templates
+    of the generated views; see `short.templatememo`. Returns `None`, so the
+    django receivers still decide the reload.
+    """
+    from . import templatememo
+    templatememo.clear()
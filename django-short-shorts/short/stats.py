@@ -0,0 +1,189 @@
+"""
+Per view statistics of the generated views. Each request records the wall
+time, the database query count and time, the template render time and the
+response size of the view class, see `short.views.instrument`:
+
+    # settings.py
+    SHORT_VIEW_STATS = True
+    SHORT_STATS_SINKS = ('short.stats.memory_sink', 'short.stats.log_sink',)
+
+Every sample is given to each sink, a function of `(name, sample)`. The
+`memory_sink` adds the sample to the histograms of the view in the process
+`registry`, served in the Prometheus text format by the `prometheus_view`:
+
+    urlpatterns += [path('metrics/', stats.prometheus_view)]
+
+and printed by `python manage.py shortstats`. The `log_sink` writes one line
+per request to the `short.stats` logger.
+"""
+import logging
+import threading
+from bisect import bisect_left
+
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+from short import conf
+
+
+logger = logging.getLogger('short.stats')
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,)
+
+## The upper bounds of the histogram buckets of each sample metric
+BOUNDS = {
+    'wall': SECONDS,
+    'queries': (0, 1, 2, 5, 10, 20, 50, 100, 200,),
+    'query_time': SECONDS,
+    'render': SECONDS,
+    'size': (1024, 10240, 102400, 1048576, 10485760,),
+}
+
+## The Prometheus metric name and help of each sample metric
+METRICS = {
+    'wall': ('short_view_seconds', 'Wall time of the view dispatch and render.'),
+    'queries': ('short_view_queries', 'Database queries of the view.'),
+    'query_time': ('short_view_query_seconds', 'Database query time of the view.'),
+    'render': ('short_view_render_seconds', 'Template render time of the view.'),
+    'size': ('short_view_response_bytes', 'Response content size of the view.'),
+}
+
+## view name: ViewStats
+registry = {}
+_lock = threading.Lock()
+
+## The STATS_SINKS setting: a tuple of the sink functions
+_sinks = {}
+
+
+class Histogram:
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # The last bucket is +Inf
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def add(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        total = 0
+        for count in self.buckets:
+            total += count
+            yield total
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0
+
+
+class ViewStats:
+    """The generated class count and the sample histograms of a view."""
+
+    def __init__(self, name, generated=0):
+        self.name = name
+        self.generated = generated
+        self.requests = 0
+        self.histograms = {key: Histogram(bounds) for key, bounds in BOUNDS.items()}
+
+    def add(self, sample):
+        self.requests += 1
+        for key, histogram in self.histograms.items():
+            value = sample.get(key)
+            if value is not None:
+                histogram.add(value)
+
+    def __getitem__(self, key):
+        return self.histograms[key]
+
+
+def _get(name):
+    stats = registry.get(name)
+    if stats is None:
+        stats = registry[name] = ViewStats(name)
+    return stats
+
+
+def generated(name):
+    """Count a generated view class of the name."""
+    with _lock:
+        _get(name).generated += 1
+
+
+def get_sinks():
+    names = tuple(conf.get('STATS_SINKS'))
+    sinks = _sinks.get(names)
+    if sinks is None:
+        sinks = _sinks[names] = tuple(import_string(x) if isinstance(x, str) else x
+                                      for x in names)
+    return sinks
+
+
+def record(name, sample):
+    """Give the `sample` dict of a request of the view to each sink."""
+    for sink in get_sinks():
+        sink(name, sample)
+
+
+def memory_sink(name, sample):
+    with _lock:
+        _get(name).add(sample)
+
+
+def log_sink(name, sample):
+    size = sample['size']
+    logger.info('%s %s %.1fms queries=%d db=%.1fms render=%.1fms size=%s',
+                name, sample['status'], sample['wall'] * 1000, sample['queries'],
+                sample['query_time'] * 1000, sample['render'] * 1000,
+                '-' if size is None else size)
+
+
+def reset():
+    """Drop the recorded samples, keeping the generated class counts."""
+    with _lock:
+        for name, stats in registry.items():
+            registry[name] = ViewStats(name, stats.generated)
+
+
+def snapshot():
+    """Return a list of the `ViewStats` with requests, slowest (by the
+    total wall time) first.
+    """
+    with _lock:
+        rows = [x for x in registry.values() if x.requests > 0]
+    return sorted(rows, key=lambda x: x['wall'].sum, reverse=True)
+
+
+def prometheus_text():
+    """Return the registry in the Prometheus text exposition format."""
+    lines = [
+        '# HELP short_view_generated Generated classes of the view.',
+        '# TYPE short_view_generated gauge',
+    ]
+    with _lock:
+        items = sorted(registry.items())
+        for name, stats in items:
+            lines.append(f'short_view_generated{{view="{name}"}} {stats.generated}')
+
+        for key, (metric, help_text) in METRICS.items():
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for name, stats in items:
+                histogram = stats[key]
+                if histogram.count == 0:
+                    continue
+                bounds = tuple(str(x) for x in histogram.bounds) + ('+Inf',)
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    lines.append(f'{metric}_bucket{{view="{name}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_sum{{view="{name}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{view="{name}"}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def prometheus_view(request):
+    return HttpResponse(prometheus_text(),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
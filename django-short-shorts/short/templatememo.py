@@ -0,0 +1,104 @@
+"""
+A memo of the templates of the generated views. The first render of a
+template names list (such as `products/product_list.html`, `crud/list.html`
+... `short/crud/list.html`) selects the template through the loaders once;
+later renders of a view with the same names reuse the compiled template.
+
+Compile the templates of the generated views of the `views` modules in the
+app `ready()`, before the first request of each worker:
+
+    # settings.py
+    SHORT_TEMPLATE_WARMUP = ('products.views',)
+
+and check the resolved template of every view of the urlconf with
+
+    python manage.py shorttemplates
+
+The memo is cleared when a file changes under the `runserver` autoreloader.
+"""
+import importlib
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist, loader
+from django.urls import URLResolver, get_resolver
+from django.views.generic.base import TemplateResponseMixin
+
+
+## (engine alias, template names): the selected Template
+_templates = {}
+
+
+def unique(names):
+    """Return the names list without the repeated names, in order."""
+    return list(dict.fromkeys(names))
+
+
+def resolve(names, using=None):
+    """Return the `select_template` of the names, once per names list."""
+    key = (using, tuple(names),)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = loader.select_template(names, using=using)
+    return template
+
+
+def clear():
+    _templates.clear()
+
+
+def template_names(view_class):
+    """Return the template names of a view class without a request, as a
+    request without an object would; `None` for views without templates.
+    """
+    if issubclass(view_class, TemplateResponseMixin) is False:
+        return None
+    view = view_class()
+    model = getattr(view, 'model', None)
+    view.object = None
+    if model is not None:
+        view.object_list = model._default_manager.none()
+    try:
+        return view.get_template_names()
+    except (ImproperlyConfigured, AttributeError):
+        return None
+
+
+def warm(view_classes):
+    """Resolve and compile the templates of the short view classes. Return
+    a dict of `{view class: Template}`, `None` for a missing template.
+    """
+    from short.views.base import ShortMixin
+
+    r = {}
+    for view_class in view_classes:
+        if issubclass(view_class, ShortMixin) is False:
+            continue
+        names = template_names(view_class)
+        if names is None:
+            continue
+        try:
+            r[view_class] = resolve(names, view_class.template_engine)
+        except TemplateDoesNotExist:
+            r[view_class] = None
+    return r
+
+
+def module_views(name):
+    """Return the view classes of the (imported) module."""
+    module = importlib.import_module(name)
+    return tuple(x for x in vars(module).values() if isinstance(x, type))
+
+
+def urlconf_views(patterns=None):
+    """Return the view classes of the urlconf patterns, once each."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    r = {}
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            r.update(dict.fromkeys(urlconf_views(pattern.url_patterns)))
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is not None:
+            r[view_class] = None
+    return tuple(r)
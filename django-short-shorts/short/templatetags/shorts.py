@@ -0,0 +1,55 @@
+"""
+    {% load shorts %}
+
+    {% for item in object_list %}
+        {% short_row item %}
+    {% endfor %}
+
+    {% short_link "detail" item.pk %}
+"""
+from django import template
+from django.urls import reverse
+
+
+register = template.Library()
+
+ROW_TEMPLATE = 'short/crud/row.html'
+
+
+@register.simple_tag(takes_context=True)
+def short_row(context, item, template_name=ROW_TEMPLATE):
+    """Render the row template for the item, through the `row_cache` of the
+    context if it exists.
+    """
+    values = {
+        'item': item,
+        'appname': context.get('appname'),
+        'model_name': context.get('model_name'),
+        'short_links': context.get('short_links'),
+    }
+
+    def render():
+        row_template = context.template.engine.get_template(template_name)
+        return row_template.render(context.new(values))
+
+    row_cache = context.get('row_cache')
+    if row_cache is None:
+        return render()
+
+    variant = f"{template_name}:{values['appname']}"
+    return row_cache.render(item, variant, render)
+
+
+@register.simple_tag(takes_context=True)
+def short_link(context, name, pk=None):
+    """Return the url of a generated view, such as "detail", through the
+    `short_links` of the context, or a standard `reverse` from the
+    `appname` and `model_name`.
+    """
+    short_links = context.get('short_links')
+    if short_links is not None:
+        return short_links.url(name, pk)
+
+    viewname = f"{context.get('appname')}:{context.get('model_name').lower()}-{name}"
+    args = () if pk is None else (pk,)
+    return reverse(viewname, args=args)
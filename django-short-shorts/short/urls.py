@@ -44,16 +44,29 @@ from django.contrib import admin
 from django.urls import path, include as django_include
 from  django.views.generic import View, TemplateView
 
+import hashlib
 import inspect
+import json
+import os
+import time
+import warnings
 
 from short.names import *
-from . import names as short_names
+from . import names as short_names, conf
+from .models import grab_models
+from .resolvers import TrieResolver
 
 
 urlpatterns = [
     # path('admin/', admin.site.urls),
 ]
 
+## The seconds of the last route compile and build; see compile_routes
+timings = {}
+
+## Bump to ignore the route snapshots of an older format
+SNAPSHOT_VERSION = 2
+
 
 def clean_str(variant):
 
@@ -124,7 +137,8 @@ def path_include(url_name, url_module, path_name=None):
     return paths(**r)
 
 
-def paths_default(views_module, model_list, ignore_missing_views=True, views=None, **options):
+def paths_default(views_module, model_list, ignore_missing_views=True, views=None,
+        snapshot=None, trie=None, **options):
     """
         from . import models
         from short.models import grab_models
@@ -133,18 +147,235 @@ def paths_default(views_module, model_list, ignore_missing_views=True, views=Non
             ignore_missing_views=True,
             views=('list', 'create', 'update', 'delete', 'detail',),
         )
+
+    The same patterns as `paths_less` with the default urls, built through
+    the single pass `compile_routes`.
+
+    The view classes of a lazy views module (`SHORT_LAZY_VIEWS`) are not
+    generated by the routes; each is generated on the first request of its
+    url. The models module is accepted in place of the `grab_models` list.
+
+    With a `snapshot` directory (default `settings.SHORT_ROUTE_SNAPSHOT`) the
+    route table is stored on disk, keyed by a hash of the models, the views
+    module and the names; see `route_key`. A warm start with the same key
+    builds the patterns from the file, without the model discovery or the
+    route compile; with a lazy views module, without generating the views:
+
+        urlpatterns = shorts.paths_default(views, models, snapshot=BASE_DIR / '.routes')
+
+    With `trie=True` (default `settings.SHORT_TRIE_RESOLVER`) the patterns
+    resolve through a `short.resolvers.TrieResolver`.
     """
-    patterns = {}
+    trie = conf.get('TRIE_RESOLVER') if trie is None else trie
+    if trie:
+        return trie_paths(paths_default(views_module, model_list,
+                                        ignore_missing_views=ignore_missing_views,
+                                        views=views, snapshot=snapshot, trie=False))
+
+    views = views or short_names.crud()
+    snapshot = conf.get('ROUTE_SNAPSHOT') if snapshot is None else snapshot
+    if snapshot:
+        filename = os.path.join(snapshot, f'{views_module.__name__}.routes.json')
+        key = route_key(views_module, model_list, views, ignore_missing_views)
+        routes = load_routes(filename, key)
+        if routes is not None:
+            return build_paths(views_module, routes)
+
+    if inspect.ismodule(model_list):
+        model_list = grab_models(model_list)
+    routes = compile_routes(views_module, model_list,
+                            views=views,
+                            ignore_missing_views=ignore_missing_views)
+    if snapshot:
+        dump_routes(filename, key, views_module, routes)
+    return build_paths(views_module, routes)
+
+
+def file_stamp(module):
+    """Return the `(mtime_ns, size)` of the source file of a module, or
+    `None`.
+    """
+    try:
+        stat = os.stat(module.__file__)
+    except (AttributeError, TypeError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size,)
+
+
+def route_key(views_module, model_list, views, ignore_missing_views=True):
+    """Return a hash of everything the route table is built from, without
+    discovering the models; the models module file (or the labels of a
+    model list), the views module file, the view names and the url
+    defaults.
+    """
+    if inspect.ismodule(model_list):
+        models_key = (model_list.__name__, file_stamp(model_list),)
+    else:
+        if isinstance(model_list, (list, tuple,)) is False:
+            model_list = (model_list,)
+        models_key = sorted(m._meta.label for m in model_list)
+
+    raw = json.dumps([
+        SNAPSHOT_VERSION,
+        views_module.__name__,
+        file_stamp(views_module),
+        models_key,
+        list(views),
+        ignore_missing_views,
+        short_names.URL_DEFAULTS,
+        MAPPED_NAMES,
+    ], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def load_routes(filename, key):
+    """Return the route table of the snapshot file, or `None` if the file
+    is missing, unreadable or has a different key.
+    """
+    try:
+        with open(filename) as stream:
+            content = json.load(stream)
+    except (OSError, ValueError):
+        return None
 
-    for name in views:
-        url = short_names.get_url(name)
-        patterns[name] = url
+    if content.get('key') != key:
+        return None
+    return tuple(tuple(x) for x in content['routes'])
 
-    return paths_less(
-            views=views_module,
-            model_list=model_list,
-            ignore_missing_views=ignore_missing_views,
-            **patterns)
+
+def dump_routes(filename, key, views_module, routes):
+    """Write the route table to the snapshot file, replaced atomically for
+    concurrent workers. A failed write warns, and leaves no temp file.
+    """
+    content = {
+        'key': key,
+        'views': views_module.__name__,
+        'routes': routes,
+    }
+
+    temp = f'{filename}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        with open(temp, 'w') as stream:
+            json.dump(content, stream, indent=1)
+        os.replace(temp, filename)
+    except OSError as e:
+        warnings.warn(f'Cannot write the route snapshot {filename}: {e}', RuntimeWarning)
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+
+
+def compile_routes(views_module, model_list, views=None, ignore_missing_views=True):
+    """Return a route table for the models and view names in one pass; a
+    tuple of `(url, name, view_class_name)` string tuples, safe to serialize:
+
+        >>> compile_routes(views, (models.Product,), views=('list', 'detail',))
+        (('product/list/', 'product-list', 'ProductListView'),
+         ('product/detail/<str:pk>/', 'product-detail', 'ProductDetailView'))
+
+    A view class missing from the `views_module` is skipped, or raises an
+    `AttributeError` if `ignore_missing_views` is `False`. A pending lazy
+    view class is not generated.
+    """
+    start = time.perf_counter()
+    if isinstance(model_list, (list, tuple,)) is False:
+        model_list = (model_list,)
+
+    parts = tuple(
+        (name, short_names.get_url(name), MAPPED_NAMES.get(name))
+        for name in views or short_names.crud()
+    )
+
+    routes = []
+    for m in model_list:
+        name = m.__name__
+        unp = name.lower()
+        seen = {}
+        for path_name, url, class_part in parts:
+            class_name = f'{name}{class_part}'
+            if has_view(views_module, class_name) is False:
+                if ignore_missing_views is False:
+                    raise AttributeError(f'{views_module.__name__} has no view {class_name}')
+                continue
+            # As paths_dict; a later duplicate view class replaces the first.
+            seen[class_name] = (f'{unp}/{url}', f'{unp}-{path_name}', class_name)
+        routes.extend(seen.values())
+
+    timings['compile_routes'] = time.perf_counter() - start
+    return tuple(routes)
+
+
+def has_view(views_module, class_name):
+    """Return `True` for a view class of the module, generated or pending
+    in a lazy views module, without generating it.
+    """
+    from .views.base import pending_view
+
+    if class_name in vars(views_module):
+        return True
+    if pending_view(views_module.__name__, class_name) is not None:
+        return True
+    return getattr(views_module, class_name, None) is not None
+
+
+def route_view(views_module, class_name, deferred=True):
+    """Return the view function of the class; a `deferred_view` for a sync
+    view class still pending in a lazy views module.
+    """
+    from .views.base import pending_view
+
+    builder = pending_view(views_module.__name__, class_name)
+    if deferred and builder is not None and getattr(builder, 'async_views', False) is False:
+        return deferred_view(views_module, class_name)
+    return class_view(views_module, class_name)
+
+
+def build_paths(views_module, routes, deferred=True):
+    """Return a list of django `path()` entries from a `compile_routes`
+    route table, reading each view class from the `views_module`.
+
+    If `deferred`, a view class pending in a lazy views module is generated
+    on the first request of the url, rather than by the urlconf. An async
+    view class is generated now; the handler must see an async view.
+    """
+    start = time.perf_counter()
+    r = [
+        path(url, route_view(views_module, class_name, deferred), name=name)
+        for url, name, class_name in routes
+    ]
+    timings['build_paths'] = time.perf_counter() - start
+    return r
+
+
+def trie_paths(patterns):
+    """Return a list of one `TrieResolver` for the `path()` entries, matching
+    the literal url segments before any pattern:
+
+        urlpatterns = shorts.trie_paths(shorts.paths_default(views, models))
+    """
+    return [TrieResolver(patterns)]
+
+
+def class_view(views_module, class_name):
+    return getattr(views_module, class_name).as_view()
+
+
+def deferred_view(views_module, class_name):
+    """Return a view function, calling the `as_view()` of the named class
+    on the first request.
+    """
+    cache = []
+
+    def view(request, *args, **kwargs):
+        if len(cache) == 0:
+            cache.append(class_view(views_module, class_name))
+        return cache[0](request, *args, **kwargs)
+
+    view.__name__ = view.__qualname__ = class_name
+    view.__module__ = views_module.__name__
+    return view
 
 
 def paths_less(views, model_list, ignore_missing_views=False, **patterns):
@@ -356,7 +587,7 @@ def paths(**path_dict):
 
     """
     flag_class = View
-    r = ()
+    r = []
     for name, params in dict(path_dict).items():
         (url, unit) = params
         func = unit
@@ -366,10 +597,9 @@ def paths(**path_dict):
             if flag_class in mros:
                 func = unit.as_view()
 
-        p = path(url, func, name=name)
-        r += (p,)
+        r.append(path(url, func, name=name))
 
-    return list(r)
+    return r
 
 
 import sys
@@ -1,3 +1,5 @@
 from .base import *
 from .serialized import JsonListView, JsonDetailView
+from .bulk import BulkCreateView, BulkUpdateView, BulkDeleteView
+from .asynchronous import AsyncJsonListView, AsyncJsonDetailView
 from . import errors
@@ -0,0 +1,177 @@
+"""
+Mixins of the generated archive (history) views.
+
+With a `date_cache` alias the `ArchiveIndexView`, `YearArchiveView` and
+`MonthArchiveView` cache their `date_list` and the row count of each date;
+see `short.datecache`:
+
+    shorts.history(models.Product, date_cache='default', date_cache_timeout=300)
+
+With `rollup=True` the `ArchiveIndexView`, `YearArchiveView` and
+`MonthArchiveView` read the `date_list` from the `short.rollup` buckets of
+the model `date_field`, one indexed query, rather than grouping the table:
+
+    shorts.history(models.Product, date_field='created', rollup=True)
+
+The buckets count every row of the model; a view with a filtered `queryset`
+should keep `rollup=False`. The context receives a `date_counts` dict of
+`{date: count}` of the `date_list`.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.http import Http404
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from django.db.models import Count, DateField, DateTimeField
+from django.db.models.functions import Trunc
+from django.views.generic.dates import MonthMixin, YearMixin, _date_from_string
+
+from short import rollup as date_rollup, datecache
+
+
+def has_field(model, name):
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def check_empty(view, date_list, queryset):
+    """Raise the `Http404` of django `get_date_list` for an empty list
+    without `allow_empty`.
+    """
+    if len(date_list) == 0 and view.get_allow_empty() is False:
+        raise Http404(_('No %(verbose_name_plural)s available') % {
+            'verbose_name_plural': queryset.model._meta.verbose_name_plural,
+        })
+
+
+class DateRangeMixin:
+
+    def get_date_range(self):
+        """Return the `(since, until)` dates of the view date list; a month,
+        a year or `(None, None)` for all.
+        """
+        if isinstance(self, MonthMixin):
+            date = _date_from_string(self.get_year(), self.get_year_format(),
+                                     self.get_month(), self.get_month_format())
+            return (date, self._get_next_month(date),)
+        if isinstance(self, YearMixin):
+            date = _date_from_string(self.get_year(), self.get_year_format())
+            return (date, self._get_next_year(date),)
+        return (None, None,)
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('date_counts', getattr(self, 'date_counts', None))
+        return super().get_context_data(**kwargs)
+
+
+class RollupMixin(DateRangeMixin):
+    rollup = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        model = getattr(cls, 'model', None)
+        if cls.rollup and model is not None and has_field(model, cls.date_field):
+            date_rollup.register(model, cls.date_field)
+
+    def uses_rollup(self):
+        return (self.rollup
+                and self.queryset is None
+                and date_rollup.is_registered(self.model, self.get_date_field()))
+
+    def to_date_value(self, date):
+        """The bucket date as `queryset.datetimes()` would return it, for a
+        DateTimeField.
+        """
+        if self.uses_datetime_field is False:
+            return date
+        value = datetime.datetime.combine(date, datetime.time.min)
+        if settings.USE_TZ:
+            value = timezone.make_aware(value, timezone.get_default_timezone())
+        return value
+
+    def get_date_list(self, queryset, date_type=None, ordering='ASC'):
+        if self.uses_rollup() is False:
+            return super().get_date_list(queryset, date_type, ordering)
+
+        if date_type is None:
+            date_type = self.get_date_list_period()
+        since, until = self.get_date_range()
+        if self.get_allow_future() is False:
+            tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+            until = tomorrow if until is None else min(until, tomorrow)
+
+        rows = date_rollup.buckets(self.model, self.get_date_field(), date_type,
+                                   since, until, ordering)
+        self.date_counts = {self.to_date_value(x): count for x, count in rows}
+        date_list = list(self.date_counts)
+        check_empty(self, date_list, queryset)
+        return date_list
+
+
+class DateCacheMixin(DateRangeMixin):
+    """Cache the `date_list` and `date_counts` of the view in the
+    `date_cache` alias for `date_cache_timeout` seconds. A miss reads both
+    from the rollup buckets, or one grouped count of the queryset.
+    """
+    date_cache = None
+    date_cache_timeout = 300
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        model = getattr(cls, 'model', None)
+        if cls.date_cache and model is not None and has_field(model, cls.date_field):
+            datecache.register(model, cls.date_field, cls.date_cache)
+
+    def get_date_cache_parts(self, date_type, ordering):
+        since, until = self.get_date_range()
+        # Without future dates the list may change at midnight.
+        today = None if self.get_allow_future() else timezone.localdate()
+        # The dates are truncated in the current time zone.
+        return (date_type, since, until, ordering, today, timezone.get_current_timezone_name(),)
+
+    def count_dates(self, queryset, date_type, ordering='ASC'):
+        """Return a dict of `{date: count}` of the queryset, truncated to
+        the `date_type` period as `queryset.dates()` or `datetimes()`.
+        """
+        date_field = self.get_date_field()
+        if self.uses_datetime_field:
+            tzinfo = timezone.get_current_timezone() if settings.USE_TZ else None
+            period = Trunc(date_field, date_type, output_field=DateTimeField(), tzinfo=tzinfo)
+        else:
+            period = Trunc(date_field, date_type, output_field=DateField())
+        order = 'short_period' if ordering == 'ASC' else '-short_period'
+        rows = (queryset.order_by()
+                .filter(**{f'{date_field}__isnull': False})
+                .annotate(short_period=period)
+                .values('short_period')
+                .annotate(short_count=Count('pk'))
+                .order_by(order))
+        return {x['short_period']: x['short_count'] for x in rows}
+
+    def get_date_list(self, queryset, date_type=None, ordering='ASC'):
+        if not self.date_cache or self.queryset is not None:
+            return super().get_date_list(queryset, date_type, ordering)
+
+        if date_type is None:
+            date_type = self.get_date_list_period()
+        date_field = self.get_date_field()
+        parts = self.get_date_cache_parts(date_type, ordering)
+        cached, key = datecache.get(self.date_cache, self.model, date_field, parts)
+
+        if cached is None:
+            if getattr(self, 'uses_rollup', None) and self.uses_rollup():
+                super().get_date_list(queryset, date_type, ordering)
+            else:
+                self.date_counts = self.count_dates(queryset, date_type, ordering)
+            cached = tuple(self.date_counts.items())
+            datecache.store(self.date_cache, key, cached, self.date_cache_timeout)
+
+        self.date_counts = dict(cached)
+        date_list = list(self.date_counts)
+        check_empty(self, date_list, queryset)
+        return date_list
@@ -0,0 +1,202 @@
+"""
+Async variants of the generated views, for an ASGI server:
+
+    shorts.crud_classes(async_views=True)
+
+The ListView, DetailView and DeleteView of each model are generated with
+`async def` handlers, reading through the async ORM (`aget`, `adelete`);
+the conditional validators read with `afirst` and `aaggregate`. A list
+reads the count, the page rows and their prefetches in one call of the
+database thread, before the render, so the template does no queries. The
+create and update views (the model form validation) and the history views
+stay synchronous.
+
+The JSON views have the async `AsyncJsonListView` and `AsyncJsonDetailView`,
+streaming from an async iterator of the rows.
+
+Django runs each async ORM call in its database thread; an async view hops
+for the queries only, rather than for the whole view. It is not a
+throughput win: each hop costs more than it frees, and `shortbench asgi`
+serves fewer list requests a second than the sync views. Use the async
+views to keep the event loop free alongside other async work.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseRedirect
+from django.utils.translation import gettext as _
+
+from .serialized import JsonListView, JsonDetailView
+
+
+async def alist(queryset):
+    """Read the rows of the queryset into its result cache; the queryset
+    is then iterated without a query. Return the list of rows.
+    """
+    return [x async for x in queryset]
+
+
+async def achunks(rows, size):
+    """Yield lists of `size` items of a lazy (sync) iterator of rows, such
+    as `queryset.iterator()`, reading each list in the database thread.
+    """
+    read = sync_to_async(lambda: list(islice(rows, size)))
+    while True:
+        chunk = await read()
+        if len(chunk) > 0:
+            yield chunk
+        if len(chunk) < size:
+            break
+
+
+class AsyncListMixin:
+    """Async `get` of a `ListView`; the page is read before the context,
+    see `read_list`.
+    """
+    page_result = None
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        self.page_result = await sync_to_async(self.read_list)(queryset, page_size)
+
+        if self.get_allow_empty() is False:
+            if page_size:
+                is_empty = len(self.page_result[2]) == 0
+            else:
+                is_empty = len(self.object_list) == 0
+            if is_empty:
+                raise Http404(_('Empty list and “%(class_name)s.allow_empty” is False.') % {
+                    'class_name': self.__class__.__name__,
+                })
+
+        context = self.get_context_data()
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_result is not None:
+            return self.page_result
+        return super().paginate_queryset(queryset, page_size)
+
+    def read_list(self, queryset, page_size):
+        """Return the `(paginator, page, object_list, is_paginated)` of the
+        `paginate_queryset` with the rows read, or `None` without a
+        `page_size`, reading all rows. Called once in the database thread;
+        the count, the rows and the prefetches are one hop.
+        """
+        if not page_size:
+            len(queryset)
+            return None
+        result = super().paginate_queryset(queryset, page_size)
+        len(result[2])
+        return result
+
+
+class AsyncObjectMixin:
+
+    async def aget_object(self, queryset=None):
+        """The `get_object` of a `SingleObjectMixin` through `aget`."""
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        if slug is not None and (pk is None or self.query_pk_and_slug):
+            queryset = queryset.filter(**{self.get_slug_field(): slug})
+        if pk is None and slug is None:
+            raise AttributeError(
+                f'Generic detail view {self.__class__.__name__} must be called with '
+                'either an object pk or a slug in the URLconf.')
+
+        try:
+            return await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404(_('No %(verbose_name)s found matching the query') % {
+                'verbose_name': queryset.model._meta.verbose_name,
+            })
+
+
+class AsyncDetailMixin(AsyncObjectMixin):
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+
+class AsyncDeleteMixin(AsyncDetailMixin):
+    """Async handlers of a `DeleteView`, deleting through `adelete`."""
+
+    async def post(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        form = self.get_form()
+        if form.is_valid():
+            return await self.aform_valid(form)
+        return self.form_invalid(form)
+
+    async def delete(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        return await self.aform_valid(None)
+
+    async def aform_valid(self, form):
+        success_url = self.get_success_url()
+        await self.object.adelete()
+        return HttpResponseRedirect(success_url)
+
+
+class AsyncJsonListView(JsonListView):
+    """The `JsonListView` with an async `get`; a `stream` reads each chunk
+    of rows in the database thread, written as it arrives.
+    """
+
+    async def aiter_chunks(self, result):
+        """The async `iter_chunks`, one list of serialized rows for each
+        `chunk_size` rows.
+        """
+        if self.use_values:
+            rows = self.iter_values(result, self.chunk_size)
+            convert = list
+        else:
+            rows = result.iterator(chunk_size=self.chunk_size)
+            convert = self.get_serialiser().serialize
+
+        async for chunk in achunks(rows, self.chunk_size):
+            yield convert(chunk)
+
+    async def aserialize(self, result):
+        if self.use_values:
+            keys = self.get_dump_keys()
+            rows = await alist(result.values_list(*keys))
+            return [dict(zip(keys, row)) for row in rows]
+        return self.get_serialiser().serialize(await alist(result))
+
+    async def get(self, request, *args, **kwargs):
+        if self.stream:
+            rows = self.aiter_chunks(self.get_results())
+            return self.render_to_stream_response(self.prop, rows,
+                                                  self.get_stream_format())
+
+        data = {
+            self.prop: await self.aserialize(self.get_results()),
+        }
+        return self.render_to_json_response(data, **kwargs)
+
+
+class AsyncJsonDetailView(JsonDetailView):
+
+    async def get(self, request, *args, **kwargs):
+        if self.use_values:
+            keys = self.get_dump_keys()
+            row = await self.model.objects.values_list(*keys).aget(id=self.kwargs['pk'])
+            data = {
+                self.prop: dict(zip(keys, row))
+            }
+            return self.render_to_json_response(data, **kwargs)
+
+        result = await self.only_selected(self.model.objects).aget(id=self.kwargs['pk'])
+        data = {
+            self.prop: self.get_serialiser().serialize([result])[0]
+        }
+        return self.render_to_json_response(data, **kwargs)
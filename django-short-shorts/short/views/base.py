@@ -1,8 +1,12 @@
 import sys
 import inspect
+import warnings
 from pathlib import Path
 
 from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import (
@@ -25,13 +29,31 @@ from django.views.generic.dates import (
     YearArchiveView,
 )
 
-from short import names as short_names
+from short import (names as short_names, fragments, conf, stats as view_stats, templatememo,
+    rollup as date_rollup, datecache)
+from short.models import registry as model_registry, indexes as model_indexes
+from . import pagination, related, links, m2m
+from .conditional import ConditionalListMixin, ConditionalObjectMixin
+from .archive import DateCacheMixin, RollupMixin, has_field
+from .asynchronous import AsyncListMixin, AsyncDetailMixin, AsyncDeleteMixin
+from .instrument import ViewStatsMixin
+from .bulk import BulkCreateView, BulkUpdateView, BulkDeleteView
 
 
 ALL = '__ALL__'
 
 
 class ShortMixin:
+    # None: plan from the model _meta, False: nothing, or a tuple of names.
+    # See short.views.related
+    select_related = None
+    prefetch_related = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return related.apply_related(queryset,
+                                     self.select_related,
+                                     self.prefetch_related)
 
     def get_template_names(self):
         v = super().get_template_names()
@@ -46,13 +68,239 @@ class ShortMixin:
             f'short/crud/{name}.html',
             f'short/crud/{mapped_name}.html',
         ]
-        return v
+        return templatememo.unique(v)
+
+    def render_to_response(self, context, **response_kwargs):
+        """Render the template of the names selected once; see
+        `short.templatememo`.
+        """
+        response_kwargs.setdefault('content_type', self.content_type)
+        template = templatememo.resolve(self.get_template_names(), self.template_engine)
+        return self.response_class(
+            request=self.request,
+            template=template,
+            context=context,
+            using=self.template_engine,
+            **response_kwargs,
+        )
 
     def get_context_data(self, **kwargs):
 
         kwargs.setdefault('model_name', self.model.__name__)
+        kwargs.setdefault('short_links', self.get_links())
         return super().get_context_data(**kwargs)
 
+    def get_links(self):
+        """Return a `short.views.links.Links` for the url namespace of the
+        request, falling back to the model app label.
+        """
+        match = getattr(self.request, 'resolver_match', None)
+        namespace = match.namespace if match is not None else None
+        if namespace is None:
+            namespace = self.model._meta.app_label
+        return links.Links(namespace, self.model.__name__)
+
+
+class ShortListMixin(ConditionalListMixin, ShortMixin):
+    """The ShortMixin for generated `ListView` classes, paginating the list
+    by default. Configure through the `base_definition`:
+
+        shorts.crud_classes(paginate_by=25, paginate_mode='offset')
+        shorts.crud_classes(cursor_field='-created')
+
+    The `paginate_mode` is 'keyset' (seek through `?after=` and `?before=`
+    cursors) or 'offset' (standard django `?page=`). The keyset seeks on the
+    `cursor_field`, or the first field of the view `ordering`, and the `pk`.
+
+    Unchanged lists respond `304 Not Modified`, see `short.views.conditional`.
+    Cache the rendered rows with a cache alias `row_cache='default'`, see
+    `short.fragments`.
+    """
+    paginate_by = 50
+    paginate_mode = 'keyset'
+    # None: the first field of the ordering, else the 'pk'.
+    cursor_field = None
+    after_kwarg = 'after'
+    before_kwarg = 'before'
+    row_cache = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.row_cache and getattr(cls, 'model', None) is not None:
+            fragments.register(cls.model, cls.row_cache)
+
+    def get_ordering(self):
+        if self.ordering is not None:
+            return self.ordering
+        return pagination.key_ordering(self.model, self.cursor_field or 'pk')
+
+    def get_cursor_field(self):
+        """Return the keyset cursor field of the view ordering; the ordering
+        must be the cursor field, optionally followed by the `pk`, in the
+        same direction.
+        """
+        ordering = self.get_ordering() or (self.cursor_field or 'pk',)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        cursor_field = self.cursor_field or ordering[0]
+
+        pk_name = self.model._meta.pk.name
+        named = tuple(x.replace(pk_name, 'pk') if x.lstrip('-') == pk_name else x
+                      for x in ordering if isinstance(x, str))
+        try:
+            key = pagination.key_ordering(self.model, cursor_field)
+        except (FieldDoesNotExist, AttributeError):
+            # A field lookup or an expression.
+            key = ()
+        if not key or named != key[:len(ordering)]:
+            raise ImproperlyConfigured(
+                f'{self.__class__.__name__} ordering {ordering} does not match the keyset '
+                f'{key} of the cursor_field {cursor_field!r}; set the paginate_mode to '
+                f"'offset' or an ordering of the cursor field and the pk.")
+        return cursor_field
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.paginate_mode != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+
+        get = self.request.GET
+        try:
+            # An empty ?before= is no cursor, not a backward page.
+            page = pagination.keyset_page(queryset, self.get_cursor_field(), page_size,
+                                          after=get.get(self.after_kwarg) or None,
+                                          before=get.get(self.before_kwarg) or None)
+        except ValueError as e:
+            raise Http404(str(e))
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_page_queries(context.get('page_obj')))
+        context['row_cache'] = self.get_row_cache(context['object_list'])
+        return context
+
+    def get_row_cache(self, object_list):
+        if not self.row_cache:
+            return None
+        field = self.get_updated_field()
+        return fragments.RowCache(self.model, self.row_cache,
+                                  field and field.attname,
+                                  object_list)
+
+    def get_page_queries(self, page):
+        """Return the `next_query` and `previous_query` query strings for
+        the page links, keeping any other GET params.
+        """
+        if page is None:
+            return {}
+
+        if self.paginate_mode == 'keyset':
+            key = (self.after_kwarg, self.before_kwarg,)
+            next_value = page.next_cursor
+            previous_value = page.previous_cursor
+        else:
+            key = (self.page_kwarg, self.page_kwarg,)
+            next_value = page.next_page_number() if page.has_next() else None
+            previous_value = page.previous_page_number() if page.has_previous() else None
+
+        return {
+            'next_query': self.page_query(key[0], next_value),
+            'previous_query': self.page_query(key[1], previous_value),
+        }
+
+    def page_query(self, key, value):
+        if value is None:
+            return None
+        query = self.request.GET.copy()
+        for k in (self.page_kwarg, self.after_kwarg, self.before_kwarg,):
+            query.pop(k, None)
+        query[key] = value
+        return f'?{query.urlencode()}'
+
+
+class ShortFormMixin(ShortMixin):
+    """The ShortMixin for generated `CreateView` and `UpdateView` classes.
+    The object and its m2m fields are saved in one transaction, writing only
+    the difference of each m2m relation; see `short.views.m2m`. Disable
+    with `m2m_delta=False` for the django `form.save()`.
+    """
+    m2m_delta = True
+
+    def form_valid(self, form):
+        if self.m2m_delta is False:
+            return super().form_valid(form)
+
+        created = form.instance._state.adding
+        with transaction.atomic():
+            self.object = form.save(commit=False)
+            self.object.save()
+            m2m.save_form_m2m(form, self.object, created=created)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class ShortDetailMixin(ConditionalObjectMixin, ShortMixin):
+    """The ShortMixin for generated `DetailView` classes, responding
+    `304 Not Modified` for an unchanged object.
+    """
+    pass
+
+
+class ShortArchiveMixin(DateCacheMixin, RollupMixin, ShortMixin):
+    """The ShortMixin for generated archive views with a `date_list`; cached
+    (`date_cache`), and read from the date buckets with `rollup=True`, see
+    `short.views.archive`.
+    """
+    pass
+
+
+## The ShortMixin applied to a generated class of the given master class.
+SHORT_MIXINS = {
+    ListView: ShortListMixin,
+    DetailView: ShortDetailMixin,
+    CreateView: ShortFormMixin,
+    UpdateView: ShortFormMixin,
+    ArchiveIndexView: ShortArchiveMixin,
+    YearArchiveView: ShortArchiveMixin,
+    MonthArchiveView: ShortArchiveMixin,
+}
+
+
+class ShortAsyncListMixin(AsyncListMixin, ShortListMixin):
+    pass
+
+
+class ShortAsyncDetailMixin(AsyncDetailMixin, ShortDetailMixin):
+    pass
+
+
+class ShortAsyncDeleteMixin(AsyncDeleteMixin, ShortMixin):
+    pass
+
+
+## The ShortMixin of a generated class with `async_views=True`, with async
+## handlers; see short.views.asynchronous. Other classes stay synchronous.
+ASYNC_MIXINS = {
+    ListView: ShortAsyncListMixin,
+    DetailView: ShortAsyncDetailMixin,
+    DeleteView: ShortAsyncDeleteMixin,
+}
+
+
+## The ShortMixin of a generated class: the mixin with the ViewStatsMixin
+_stats_mixins = {}
+
+
+def stats_mixin(short_mixin):
+    """Return the `short_mixin` with the `ViewStatsMixin`, recording the
+    request samples of the view; see `short.stats`.
+    """
+    mixin = _stats_mixins.get(short_mixin)
+    if mixin is None:
+        mixin = type(f'Stats{short_mixin.__name__}', (ViewStatsMixin, short_mixin,), {})
+        _stats_mixins[short_mixin] = mixin
+    return mixin
+
 
 def extract_location(target):
     # appname == 'products'
@@ -65,7 +313,12 @@ def extract_location(target):
 
 
 def create_class_slot(master_class, *additional_classes, **kwargs):
-    _cls = (ShortMixin, master_class, ) + additional_classes
+    short_mixin = SHORT_MIXINS.get(master_class, ShortMixin)
+    if kwargs.get('async_views'):
+        short_mixin = ASYNC_MIXINS.get(master_class, short_mixin)
+    if kwargs.get('view_stats', conf.get('VIEW_STATS')):
+        short_mixin = stats_mixin(short_mixin)
+    _cls = (short_mixin, master_class, ) + additional_classes
     return (_cls, (kwargs,{},), )
 
 
@@ -82,32 +335,42 @@ def discover_models(target_name, models=None, module_needles=None):
     if models is not None:
         return models
 
-    no_needles = module_needles in (False, ALL, )
-    needles = () if module_needles is None else module_needles
-    keeps = ()
+    if module_needles in (False, ALL, ):
+        return model_registry.all_models()
 
     model_name = first_bit(target_name)
-    all_classes = apps.get_models(model_name)
-    needles += (model_name,)
-
-    for model in all_classes:
-        module_name = first_bit(model.__module__)
-        if no_needles or (module_name in needles):
-            keeps += (model, )
+    if not module_needles:
+        return model_registry.models_for_package(model_name)
 
-    return keeps
+    needles = set(module_needles) | {model_name}
+    return tuple(
+        model for model in model_registry.all_models()
+        if first_bit(model.__module__) in needles
+    )
 
 
 def crud_classes(target_name=None, model_class=None, success_url=None,
                 success_url_bit='list', models=None, module_needles=None,
-                **base_definition):
+                lazy=None, **base_definition):
     """
         return tuple(
                 crud(m, target_name, success_url, success_url_bit, **base_definition)
                 for m in ensure_tuple(model_class)
             )
+
+    With `lazy=True` (or the `SHORT_LAZY_VIEWS` setting) the classes are
+    generated on the first access of the module attribute, such as
+    `views.ProductListView`, and the names are returned in place of the
+    classes.
+
+    With `async_views=True` the list, detail and delete views have async
+    handlers for an ASGI server; see `short.views.asynchronous`.
+
+    With `view_stats=True` (default `settings.SHORT_VIEW_STATS`) each view
+    records the time, queries and size of its requests in `short.stats`.
     """
     r = ()
+    lazy = conf.get('LAZY_VIEWS') if lazy is None else lazy
     if target_name is None:
         target_name = inspect.currentframe().f_back.f_globals['__name__']
 
@@ -120,13 +383,14 @@ def crud_classes(target_name=None, model_class=None, success_url=None,
         v = crud(m, class_module_name=target_name,
                  success_url=success_url,
                  success_url_bit=success_url_bit,
+                 lazy=lazy,
                  **base_definition)
         r += (v,)
     return r
 
 
 def history_classes(target_name=None, model_class=None, models=None, class_module_name=None,
-                    module_needles=None, **base_definition) -> tuple:
+                    module_needles=None, lazy=None, **base_definition) -> tuple:
     """Generate a range of "history" class-based-views for the given `model_class`
     list. This is synonymous to calling `short.views.history` repeatedly.
 
@@ -154,11 +418,16 @@ def history_classes(target_name=None, model_class=None, models=None, class_modul
             if model discovery is used. If a dicovered model originated from
             a module name within the needles, history views will be created
             (default: {None}).
+        lazy {bool} -- Generate each class on the first access of the
+            module attribute. If `None` the `SHORT_LAZY_VIEWS` setting
+            is used (default: {None})
 
     Returns:
         {tuple} -- A tuple of generated classes. The class-based-views already
-                 exist within the `target_name`
+                 exist within the `target_name`. If lazy, a tuple of the
+                 pending class names.
     """
+    lazy = conf.get('LAZY_VIEWS') if lazy is None else lazy
 
     if target_name is None:
         target_name = inspect.currentframe().f_back.f_globals['__name__']
@@ -171,12 +440,13 @@ def history_classes(target_name=None, model_class=None, models=None, class_modul
     r = ()
     for m in model_class:
         v = history(m, class_module_name=class_module_name or target_name,
-                 **base_definition)
+                 lazy=lazy, **base_definition)
         r += (v,)
     return r
 
 
-def crud(model, class_module_name=None, success_url=None, success_url_bit='list', **base_definition):
+def crud(model, class_module_name=None, success_url=None, success_url_bit='list',
+         lazy=False, **base_definition):
     """
         crud(models.Product)
 
@@ -203,6 +473,13 @@ def crud(model, class_module_name=None, success_url=None, success_url_bit='list'
             model = models.Product
 
 
+        class ProductBulkCreateView(BulkCreateView):
+            model = models.Product
+            fields = '__all__'
+
+        # ProductBulkUpdateView, ProductBulkDeleteView; see short.views.bulk
+
+
         same as:
 
             listview = gen_class(name, (ListView,), base_definition)
@@ -227,6 +504,9 @@ def crud(model, class_module_name=None, success_url=None, success_url_bit='list'
     base_definition.setdefault('model', model)
     success_url_d = {'success_url': reverse_lazy(lazy_url)}
     create_update_def = {'fields':'__all__', **success_url_d}
+    # The deleted object doesn't need its relations.
+    delete_def = {'select_related': False, 'prefetch_related': False, **success_url_d}
+    bulk_def = {'fields': '__all__', 'select_related': False, 'prefetch_related': False}
 
     parts = (
         # Order is important here.
@@ -235,15 +515,21 @@ def crud(model, class_module_name=None, success_url=None, success_url_bit='list'
         (CreateView, create_update_def,),
         (UpdateView, create_update_def,),
         DetailView,
-        (DeleteView, success_url_d),
+        (DeleteView, delete_def),
+        (BulkCreateView, bulk_def),
+        (BulkUpdateView, bulk_def),
+        (BulkDeleteView, bulk_def),
     )
 
-    return thin_parts_gen(parts, name, base_definition, class_module_name)
+    return thin_parts_gen(parts, name, base_definition, class_module_name, lazy)
 
 
-def history(model, class_module_name=None, **base_definition):
+def history(model, class_module_name=None, lazy=False, **base_definition):
     """
         shorts.history(models.Product, __name__, date_field='created')
+
+    Read the date lists of the archive views from the `short.rollup` date
+    buckets with `rollup=True`.
     """
 
     if class_module_name is None:
@@ -252,6 +538,12 @@ def history(model, class_module_name=None, **base_definition):
     appname, mod_first, name = extract_location(model)
     base_definition.setdefault('model', model)
     base_definition.setdefault('date_field', 'created')
+    check_date_index(model, base_definition['date_field'])
+    if base_definition.get('rollup') and has_field(model, base_definition['date_field']):
+        # Count the saves before the (lazy) classes exist.
+        date_rollup.register(model, base_definition['date_field'])
+    if base_definition.get('date_cache') and has_field(model, base_definition['date_field']):
+        datecache.register(model, base_definition['date_field'], base_definition['date_cache'])
 
     parts = (
         ArchiveIndexView,
@@ -263,14 +555,89 @@ def history(model, class_module_name=None, **base_definition):
         YearArchiveView,
     )
 
-    return thin_parts_gen(parts, name, base_definition, class_module_name)
+    return thin_parts_gen(parts, name, base_definition, class_module_name, lazy)
 
 
-def thin_parts_gen(parts, name, base_definition, class_module_name):
+def check_date_index(model, date_field):
+    """Warn if the `date_field` of the archive views has no index; each
+    archive view filters and orders the table by it.
+    """
+    try:
+        indexed = model_indexes.is_indexed(model, date_field)
+    except FieldDoesNotExist:
+        return True
+    if indexed is False:
+        warnings.warn(
+            f'{model._meta.label}.{date_field} is the history date_field without an index;'
+            f' declare it with shorts.dt_created(index=True) or Meta.indexes',
+            model_indexes.UnindexedWarning, stacklevel=3)
+    return indexed
+
+
+def thin_parts_gen(parts, name, base_definition, class_module_name, lazy=False):
+    if lazy:
+        return lazy_parts_gen(parts, name, base_definition, class_module_name)
     packs = gen_thin_packs(parts, base_definition)
     return gen_packed_views(name, class_module_name, packs)
 
 
+## class module name: {view class name: builder}
+_lazy_views = {}
+
+
+def lazy_parts_gen(parts, name, base_definition, class_module_name):
+    """Register the view class names of the parts as pending in the
+    class module, and return the names. The first access of any one name
+    generates all the views of the parts.
+    """
+    names = tuple(f'{name}{ensure_tuple(part)[0].__name__}' for part in parts)
+
+    def build():
+        pending = _lazy_views.get(class_module_name, {})
+        for view_class_name in names:
+            pending.pop(view_class_name, None)
+        return thin_parts_gen(parts, name, base_definition, class_module_name)
+
+    # The urls defer the sync views only; see short.urls.route_view
+    build.async_views = bool(base_definition.get('async_views'))
+    register_lazy_views(class_module_name, names, build)
+    return names
+
+
+def pending_view(class_module_name, name):
+    """Return the builder of a lazy view class not yet generated, or `None`."""
+    return _lazy_views.get(class_module_name, {}).get(name)
+
+
+def register_lazy_views(class_module_name, names, builder):
+    pending = _lazy_views.setdefault(class_module_name, {})
+    for view_class_name in names:
+        pending[view_class_name] = builder
+
+    module = sys.modules[class_module_name]
+    current = module.__dict__.get('__getattr__')
+    if getattr(current, 'short_lazy', False) is False:
+        module.__getattr__ = lazy_module_getattr(class_module_name, current)
+
+
+def lazy_module_getattr(class_module_name, fallback=None):
+    """Return a PEP 562 module `__getattr__`, generating a pending view class
+    on access. Other names are given to the `fallback` module `__getattr__`.
+    """
+    def __getattr__(name):
+        builder = _lazy_views.get(class_module_name, {}).get(name)
+        if builder is not None:
+            builder()
+            return sys.modules[class_module_name].__dict__[name]
+
+        if fallback is not None:
+            return fallback(name)
+        raise AttributeError(f'module {class_module_name!r} has no attribute {name!r}')
+
+    __getattr__.short_lazy = True
+    return __getattr__
+
+
 def gen_thin_packs(parts, base_definition):
     """
         parts = (
@@ -298,7 +665,8 @@ def gen_thin_packs(parts, base_definition):
     for part in parts:
         part = ensure_tuple(part)
         kw = part[1] if len(part) > 1 else {}
-        slot = create_class_slot(part[0], **base_definition, **kw)
+        # The part definition is a default; the base_definition wins.
+        slot = create_class_slot(part[0], **{**kw, **base_definition})
         packs += (slot, )
     return packs
 
@@ -347,15 +715,16 @@ def gen_class(crud_name, crud_parents, class_definition, class_module_name=None,
     view_class_name = params.pop('view_class_name', None)  or f"{crud_name}{parent_class_name}"
     print('Generating', view_class_name)
     class_members = copy_update(class_definition, **params)
+    class_members.setdefault('__module__', class_module_name)
     new_view_class = type(view_class_name, crud_parents, class_members)
     module = sys.modules[class_module_name]
     setattr(module, view_class_name, new_view_class)
-    view_cache[view_class_name] +=1
+    view_stats.generated(f'{class_module_name}.{view_class_name}')
     return new_view_class
 
 
-from collections import defaultdict
-view_cache = defaultdict(int)
+## The per view class stats, by "module.ClassName"; see short.stats
+view_cache = view_stats.registry
 
 def copy_update(entity, **params):
     r = entity.copy()
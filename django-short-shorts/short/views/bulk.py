@@ -0,0 +1,376 @@
+"""
+Bulk views, accepting a JSON array of rows in one request. Each row is
+validated with the model form of the view, and all rows are saved together
+in one transaction; any invalid row saves nothing.
+
+    POST /products/product/bulk/create/
+        [{"name": "apple", "count": 3}, {"name": "pear"}]
+
+    201 {"count": 2, "pks": [11, 12]}
+
+    POST /products/product/bulk/update/
+        [{"pk": 11, "count": 4}, {"pk": 12, "name": "pears", "location": [1]}]
+
+    200 {"count": 2, "pks": [11, 12]}
+
+    POST /products/product/bulk/delete/
+        [11, 12]
+
+    200 {"count": 2, "pks": [11, 12]}
+
+    400 {"errors": {"1": {"count": [{"message": "Enter a whole number.", "code": "invalid"}]}}}
+
+An update row changes only the fields it names. The views are generated by
+`shorts.crud` with the other crud views, named such as `ProductBulkCreateView`.
+
+`bulk_create` and `bulk_update` send no signals; the views count the rows in
+the `short.rollup` date buckets and drop the `short.datecache` date lists
+themselves. The delete sends `post_delete` for each row.
+"""
+import json
+from functools import lru_cache
+
+from django.core.exceptions import (BadRequest, FieldDoesNotExist,
+    ImproperlyConfigured, ValidationError)
+from django.db import transaction
+from django.forms import ModelChoiceField, ModelMultipleChoiceField, modelform_factory
+from django.http import JsonResponse
+from django.views.generic import View
+
+from short import fragments, rollup, datecache
+from short.models import ids
+from . import m2m
+
+
+class SharedChoiceField(ModelChoiceField):
+    """A `ModelChoiceField` checking the value against the `known` dict of
+    `{str(key): object}`, read once for all the rows of a bulk request,
+    rather than a query for every row.
+    """
+    known = None
+
+    def to_python(self, value):
+        if self.known is None or value in self.empty_values:
+            return super().to_python(value)
+        obj = self.known.get(str(value))
+        if obj is None:
+            raise ValidationError(self.error_messages['invalid_choice'],
+                                  code='invalid_choice')
+        return obj
+
+
+class SharedChoicesField(ModelMultipleChoiceField):
+    """The `SharedChoiceField` of a many to many relation.
+    """
+    known = None
+
+    def clean(self, value):
+        if self.known is None:
+            return super().clean(value)
+        value = self.prepare_value(value)
+        if not value:
+            if self.required:
+                raise ValidationError(self.error_messages['required'], code='required')
+            return []
+        if isinstance(value, (list, tuple,)) is False:
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+
+        r = []
+        for key in value:
+            obj = self.known.get(str(key))
+            if obj is None:
+                raise ValidationError(self.error_messages['invalid_choice'],
+                                      code='invalid_choice', params={'value': key})
+            r.append(obj)
+        self.run_validators(value)
+        return r
+
+
+def bulk_formfield(field, **kwargs):
+    if field.many_to_many:
+        kwargs.setdefault('form_class', SharedChoicesField)
+    elif field.many_to_one or field.one_to_one:
+        kwargs.setdefault('form_class', SharedChoiceField)
+    return field.formfield(**kwargs)
+
+
+@lru_cache(maxsize=256)
+def bulk_form_class(model, fields, form_class=None):
+    """Return a (cached) model form class of the `fields` tuple, or
+    `'__all__'`.
+    """
+    kw = {} if form_class is None else {'form': form_class}
+    return modelform_factory(model, fields=fields, formfield_callback=bulk_formfield, **kw)
+
+
+def choice_values(rows, name, multiple=False):
+    for row in rows:
+        value = row.get(name) if isinstance(row, dict) else None
+        if value in (None, '', [],):
+            continue
+        if multiple and isinstance(value, (list, tuple,)):
+            yield from value
+        elif multiple is False:
+            yield value
+
+
+class BulkMixin:
+    model = None
+    fields = None
+    form_class = None
+    # The maximum rows of one request, and the rows of one INSERT or UPDATE.
+    max_rows = 10_000
+    batch_size = 500
+    pk_key = 'pk'
+    http_method_names = ['post', 'options']
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_form_class(self, keys=None, partial=False):
+        """Return the model form class of the view `fields`. Given the `keys`
+        of a row, the fields of the row and the fields without a model
+        default, or only the fields of the row if `partial`.
+        """
+        fields = self.fields
+        if fields is None and self.form_class is None:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} has no fields')
+
+        if keys is not None:
+            fields = tuple(
+                x for x in self.get_form_fields()
+                if x in keys or (partial is False and self.has_default(x) is False)
+            )
+        elif isinstance(fields, (list, tuple,)):
+            fields = tuple(fields)
+        return bulk_form_class(self.model, fields, self.form_class)
+
+    def has_default(self, name):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.has_default()
+
+    def get_form_fields(self):
+        """Return the tuple of field names the forms may change."""
+        return tuple(self.get_form_class().base_fields)
+
+    def get_rows(self):
+        """Return the list of rows from the JSON request body, or raise a
+        `BadRequest`.
+        """
+        try:
+            rows = json.loads(self.request.body)
+        except ValueError:
+            raise BadRequest('The body is not JSON')
+
+        if isinstance(rows, list) is False:
+            raise BadRequest('The body must be a JSON array')
+        if len(rows) > self.max_rows:
+            raise BadRequest(f'More than {self.max_rows} rows')
+        return rows
+
+    def share_choices(self, forms, rows):
+        """Read the related objects of every row in one query for each
+        relation field, and give them to the fields of each form.
+        """
+        known = {}
+        for name, field in self.get_form_class().base_fields.items():
+            if isinstance(field, (SharedChoiceField, SharedChoicesField,)) is False:
+                continue
+            key = field.to_field_name or 'pk'
+            model_field = field.queryset.model._meta.get_field(key) if key != 'pk' \
+                else field.queryset.model._meta.pk
+            multiple = isinstance(field, SharedChoicesField)
+            values = set()
+            for value in choice_values(rows, name, multiple):
+                try:
+                    values.add(model_field.to_python(value))
+                except ValidationError:
+                    continue
+            objects = field.queryset.filter(**{f'{key}__in': values}) if values else ()
+            known[name] = {str(getattr(x, key)): x for x in objects}
+
+        for form in forms:
+            for name, field in form.fields.items():
+                if name in known:
+                    field.known = known[name]
+
+    def get_m2m_fields(self, form):
+        return tuple(
+            f for f in self.model._meta.many_to_many
+            if f.name in form.cleaned_data
+        )
+
+    def save_m2m(self, forms, replace=True):
+        """Write the m2m values of the valid `forms` (after the objects are
+        saved); one delete (if `replace`) and one insert for each m2m field.
+        """
+        values = {}
+        for form in forms:
+            for field in self.get_m2m_fields(form):
+                if m2m.is_bulk_field(field) is False:
+                    field.save_form_data(form.instance, form.cleaned_data[field.name])
+                    continue
+                targets = tuple(x.pk for x in form.cleaned_data[field.name])
+                values.setdefault(field, {})[form.instance.pk] = targets
+
+        for field, field_values in values.items():
+            if replace:
+                m2m.set_many(field, field_values, self.batch_size)
+                continue
+            pairs = tuple((a, b) for a, bs in field_values.items() for b in bs)
+            m2m.add_pairs(field, pairs, self.batch_size)
+
+    def invalid(self, errors):
+        return JsonResponse({'errors': errors}, status=400)
+
+    def done(self, objects, status=200):
+        fragments.invalidate(self.model, tuple(x.pk for x in objects))
+        return JsonResponse({
+            'count': len(objects),
+            'pks': [x.pk for x in objects],
+        }, status=status)
+
+
+class BulkCreateView(BulkMixin, View):
+    """Create a model row for each object of the JSON array, through one
+    `short.models.ids.bulk_create`; a collision of generated short ids
+    inserts all again with new ids.
+    """
+
+    def post(self, request, *args, **kwargs):
+        rows = self.get_rows()
+        forms = []
+        errors = {}
+        for index, row in enumerate(rows):
+            if isinstance(row, dict) is False:
+                errors[index] = {'__all__': [{'message': 'Not an object', 'code': 'invalid'}]}
+                continue
+            forms.append((index, self.get_form_class(keys=row)(data=row),))
+
+        self.share_choices([x[1] for x in forms], rows)
+        for index, form in forms:
+            if form.is_valid() is False:
+                errors[index] = form.errors.get_json_data()
+        forms = [x[1] for x in forms]
+
+        if len(errors) > 0:
+            return self.invalid(errors)
+
+        objects = [form.instance for form in forms]
+        with transaction.atomic():
+            ids.bulk_create(self.model, objects, batch_size=self.batch_size)
+            rollup.add_objects(self.model, objects)
+            datecache.invalidate_fields(self.model)
+            # New rows have no relations to replace.
+            self.save_m2m(forms, replace=False)
+        return self.done(objects, status=201)
+
+
+class BulkUpdateView(BulkMixin, View):
+    """Update the model rows named by the `pk` key of each object of the
+    JSON array, through one `bulk_update`. Only the given fields change.
+    """
+
+    def get_pk(self, row):
+        pk = row.get(self.pk_key, row.get(self.model._meta.pk.attname))
+        if pk is None:
+            return None
+        try:
+            return self.model._meta.pk.to_python(pk)
+        except Exception:
+            return None
+
+    def post(self, request, *args, **kwargs):
+        rows = self.get_rows()
+        errors = {}
+
+        pks = []
+        for index, row in enumerate(rows):
+            pk = self.get_pk(row) if isinstance(row, dict) else None
+            if pk is None:
+                errors[index] = {self.pk_key: [{'message': 'A pk is required', 'code': 'required'}]}
+            pks.append(pk)
+
+        if len(errors) > 0:
+            return self.invalid(errors)
+
+        instances = self.get_queryset().in_bulk(set(pks))
+        # The dates before the forms change the instances.
+        dates = rollup.object_dates(self.model, instances.values())
+        forms = []
+        for index, (row, pk) in enumerate(zip(rows, pks)):
+            instance = instances.get(pk)
+            if instance is None:
+                errors[index] = {self.pk_key: [{'message': 'Not found', 'code': 'invalid'}]}
+                continue
+            forms.append((index, self.get_form_class(keys=row, partial=True)(data=row, instance=instance),))
+
+        self.share_choices([x[1] for x in forms], rows)
+        for index, form in forms:
+            if form.is_valid() is False:
+                errors[index] = form.errors.get_json_data()
+        forms = [x[1] for x in forms]
+
+        if len(errors) > 0:
+            return self.invalid(errors)
+
+        objects = list({id(f.instance): f.instance for f in forms}.values())
+        fields = self.get_update_fields(forms, objects)
+        with transaction.atomic():
+            if len(fields) > 0:
+                self.get_queryset().bulk_update(objects, fields, batch_size=self.batch_size)
+                rollup.move_objects(self.model, dates, objects)
+                datecache.invalidate_fields(self.model, fields)
+            self.save_m2m(forms)
+        return self.done(objects)
+
+    def get_update_fields(self, forms, objects):
+        """Return the concrete field names of the forms, and any `auto_now`
+        field (which `bulk_update` does not set) of the model.
+        """
+        names = {}
+        for form in forms:
+            names.update(dict.fromkeys(form._meta.fields))
+
+        r = []
+        for field in self.model._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            if getattr(field, 'auto_now', False):
+                for obj in objects:
+                    field.pre_save(obj, False)
+                r.append(field.name)
+            elif field.name in names:
+                r.append(field.name)
+        return r
+
+
+class BulkDeleteView(BulkMixin, View):
+    """Delete the model rows of a JSON array of pks (or objects with a
+    `pk` key), in one `delete()`.
+    """
+
+    def post(self, request, *args, **kwargs):
+        rows = self.get_rows()
+        pk_field = self.model._meta.pk
+        pks = []
+        errors = {}
+        for index, row in enumerate(rows):
+            if isinstance(row, dict):
+                row = row.get(self.pk_key, row.get(pk_field.attname))
+            try:
+                pks.append(pk_field.to_python(row))
+            except Exception:
+                errors[index] = {self.pk_key: [{'message': 'A pk is required', 'code': 'required'}]}
+
+        if len(errors) > 0:
+            return self.invalid(errors)
+
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(pk__in=pks)
+            objects = list(queryset.only('pk'))
+            queryset.delete()
+        return self.done(objects)
@@ -0,0 +1,189 @@
+"""
+HTTP conditional responses for the generated and JSON views.
+
+The validators are read from the model `updated_field` (default `updated`,
+such as a `shorts.dt_updated()`) before the view does any work. A client
+sending a matching `If-None-Match` or `If-Modified-Since` receives a
+`304 Not Modified` without a template render or serialization.
+
++ Object views use the `updated` value of the one row, as the `ETag` and
+  `Last-Modified`.
++ List views use the `Max('updated')` and the row count of the queryset as
+  the `ETag` only; a deleted row doesn't change the `Max('updated')`, so a
+  list has no `Last-Modified`.
+
+Models without the field are unaffected. Disable with `updated_field=None`.
+An async view reads the validators through the async ORM.
+"""
+import hashlib
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    raw = '|'.join(str(x) for x in parts)
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def to_timestamp(value):
+    if value is None:
+        return None
+    return timegm(value.utctimetuple())
+
+
+class ConditionalMixin:
+    updated_field = 'updated'
+
+    def get_updated_field(self):
+        if not self.updated_field:
+            return None
+        try:
+            return self.model._meta.get_field(self.updated_field)
+        except FieldDoesNotExist:
+            return None
+
+    def get_validators(self):
+        """Return a tuple of `(etag, last_modified)`, or `(None, None)`
+        for no conditional response.
+        """
+        return (None, None, )
+
+    async def aget_validators(self):
+        return await sync_to_async(self.get_validators)()
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators()
+        if etag is None and last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        timestamp = to_timestamp(last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        return self.set_validators(response, etag, timestamp)
+
+    async def adispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = await self.aget_validators()
+        if etag is None and last_modified is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        timestamp = to_timestamp(last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            return response
+
+        response = await super().dispatch(request, *args, **kwargs)
+        return self.set_validators(response, etag, timestamp)
+
+    def set_validators(self, response, etag, timestamp):
+        if 200 <= response.status_code < 300:
+            if etag is not None:
+                response.headers.setdefault('ETag', etag)
+            if timestamp is not None:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+        return response
+
+
+class ConditionalObjectMixin(ConditionalMixin):
+    """Validators from the `updated_field` of the single object, read
+    with a `values_list` query on the `pk`.
+    """
+
+    def get_conditional_queryset(self):
+        return self.get_queryset()
+
+    def get_validator_query(self):
+        """Return the `values_list` queryset of the `updated` value of the
+        object, or `None`.
+        """
+        field = self.get_updated_field()
+        pk = self.kwargs.get(getattr(self, 'pk_url_kwarg', 'pk'))
+        if field is None or pk is None:
+            return None
+
+        queryset = self.get_conditional_queryset()
+        queryset = queryset.select_related(None).prefetch_related(None)
+        return queryset.filter(pk=pk).values_list(field.attname)
+
+    def row_validators(self, row):
+        if row is None:
+            # Let the view raise the 404
+            return (None, None, )
+
+        updated = row[0]
+        pk = self.kwargs.get(getattr(self, 'pk_url_kwarg', 'pk'))
+        etag = make_etag(self.model._meta.label, pk, updated)
+        return (etag, updated, )
+
+    def get_validators(self):
+        queryset = self.get_validator_query()
+        if queryset is None:
+            return (None, None, )
+        return self.row_validators(queryset.first())
+
+    async def aget_validators(self):
+        queryset = self.get_validator_query()
+        if queryset is None:
+            return (None, None, )
+        return self.row_validators(await queryset.afirst())
+
+
+class ConditionalListMixin(ConditionalMixin):
+    """An `ETag` from the `Max(updated_field)` and the row count of the
+    list queryset, and the query string. No `Last-Modified`; the
+    `Max(updated_field)` of a list is unchanged by a delete.
+    """
+
+    def get_conditional_queryset(self):
+        return self.get_queryset()
+
+    def get_validator_query(self):
+        """Return the queryset and the aggregates of the validators, or
+        `(None, None)`.
+        """
+        field = self.get_updated_field()
+        if field is None:
+            return (None, None, )
+
+        queryset = self.get_conditional_queryset()
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if queryset.query.is_sliced is False:
+            queryset = queryset.order_by()
+        return (queryset, {'updated': Max(field.attname), 'count': Count('pk')},)
+
+    def get_validators(self):
+        queryset, aggregates = self.get_validator_query()
+        if queryset is None:
+            return (None, None, )
+        return self.list_validators(queryset.aggregate(**aggregates))
+
+    async def aget_validators(self):
+        queryset, aggregates = self.get_validator_query()
+        if queryset is None:
+            return (None, None, )
+        return self.list_validators(await queryset.aaggregate(**aggregates))
+
+    def list_validators(self, values):
+        updated = values['updated']
+        etag = make_etag(self.model._meta.label,
+                         self.request.get_full_path(),
+                         updated,
+                         values['count'])
+        return (etag, None, )
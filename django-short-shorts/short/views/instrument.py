@@ -0,0 +1,140 @@
+"""
+The `ViewStatsMixin` of the generated views, recording a sample of each
+request to the `short.stats` sinks: the wall time of the dispatch and the
+template render, the queries and their time on every database, the render
+time and the response size.
+
+`create_class_slot` adds the mixin to the generated classes with
+`SHORT_VIEW_STATS = True`, or `view_stats=True` in the class definition:
+
+    shorts.crud_classes(view_stats=True)
+"""
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.template.response import SimpleTemplateResponse, TemplateResponse
+
+from short import stats
+
+
+## The Probe of the current request, set for the dispatch and the render;
+## async views read in the database thread with a copy of the context.
+current_probe = ContextVar('short_probe', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """The database execute wrapper, timing the query for the current
+    `Probe`.
+    """
+    probe = current_probe.get()
+    if probe is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        probe.count += 1
+        probe.seconds += time.perf_counter() - start
+
+
+def count_queries():
+    """Return an `ExitStack` of the `count_query` execute wrapper entered on
+    every connection of the thread; closed at the end of the request.
+    """
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(count_query))
+    return stack
+
+
+class Probe:
+    """Time and count the queries of the request, while set as the
+    `current_probe` and the `count_queries` wrappers are entered.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.start = time.perf_counter()
+
+    def close(self):
+        """Return the seconds since the start."""
+        return time.perf_counter() - self.start
+
+
+class StatsTemplateResponse(TemplateResponse):
+    render_time = None
+    # The Probe of the view, counting the queries of the render.
+    probe = None
+
+    @property
+    def rendered_content(self):
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            if self.probe is not None:
+                stack.enter_context(count_queries())
+                stack.callback(current_probe.reset, current_probe.set(self.probe))
+            content = super().rendered_content
+        self.render_time = time.perf_counter() - start
+        return content
+
+
+class ViewStatsMixin:
+    response_class = StatsTemplateResponse
+    view_stats = True
+
+    @classmethod
+    def get_stats_name(cls):
+        return f'{cls.__module__}.{cls.__name__}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_stats is False:
+            return super().dispatch(request, *args, **kwargs)
+
+        probe = Probe()
+        if self.view_is_async:
+            return self.adispatch_stats(probe, request, *args, **kwargs)
+
+        token = current_probe.set(probe)
+        try:
+            with count_queries():
+                response = super().dispatch(request, *args, **kwargs)
+        finally:
+            current_probe.reset(token)
+        return self.record_stats(probe, response)
+
+    async def adispatch_stats(self, probe, request, *args, **kwargs):
+        # The async ORM queries in the thread sensitive database thread.
+        stack = await sync_to_async(count_queries)()
+        token = current_probe.set(probe)
+        try:
+            response = await super().dispatch(request, *args, **kwargs)
+        finally:
+            current_probe.reset(token)
+            await sync_to_async(stack.close)()
+        return self.record_stats(probe, response)
+
+    def record_stats(self, probe, response):
+        """Record the sample of the response; a template response once
+        rendered.
+        """
+        if isinstance(response, SimpleTemplateResponse) and response.is_rendered is False:
+            response.probe = probe
+            response.add_post_render_callback(lambda r: self.send_stats(probe, r))
+        else:
+            self.send_stats(probe, response)
+        return response
+
+    def send_stats(self, probe, response):
+        wall = probe.close()
+        stats.record(self.get_stats_name(), {
+            'status': response.status_code,
+            'wall': wall,
+            'queries': probe.count,
+            'query_time': probe.seconds,
+            'render': getattr(response, 'render_time', None) or 0.0,
+            'size': None if response.streaming else len(response.content),
+        })
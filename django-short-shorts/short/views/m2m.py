@@ -0,0 +1,171 @@
+"""
+Write many to many relations through the `through` model in bulk, rather
+than an `.add()` or `.set()` (and its queries) for every object.
+
+The bulk functions send no `m2m_changed` signal; callers invalidate any
+cache of the rows themselves. `save_delta` (of the generated create and
+update views) sends the signals as a `.set()`.
+"""
+from itertools import chain
+
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+
+
+def is_bulk_field(field):
+    """True for a m2m field with an auto created `through` model, of which
+    the rows carry no more than the two keys.
+    """
+    return field.many_to_many and field.remote_field.through._meta.auto_created
+
+
+def through_names(field):
+    """Return the `(source, target)` attnames of the through model.
+    """
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    return (source, target, )
+
+
+def is_symmetrical(field):
+    return field.remote_field.symmetrical and field.remote_field.model == field.model
+
+
+def through_pairs(field, pairs):
+    """Return the unique `(source_pk, target_pk)` pairs, adding the reverse
+    of each pair for a symmetrical (self) relation.
+    """
+    r = dict.fromkeys(pairs)
+    if is_symmetrical(field):
+        r.update(dict.fromkeys((b, a) for a, b in pairs))
+    return tuple(r)
+
+
+def add_pairs(field, pairs, batch_size=None):
+    """Insert the `(source_pk, target_pk)` pairs in one `bulk_create`.
+    Existing pairs are ignored.
+    """
+    pairs = through_pairs(field, pairs)
+    if len(pairs) == 0:
+        return ()
+    through = field.remote_field.through
+    source, target = through_names(field)
+    rows = [through(**{source: a, target: b}) for a, b in pairs]
+    through._default_manager.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return pairs
+
+
+def remove_pairs(field, pairs):
+    """Delete the `(source_pk, target_pk)` pairs in one query.
+    """
+    pairs = through_pairs(field, pairs)
+    if len(pairs) == 0:
+        return 0
+
+    targets = {}
+    for a, b in pairs:
+        targets.setdefault(a, []).append(b)
+
+    through = field.remote_field.through
+    source, target = through_names(field)
+    q = Q()
+    for a, bs in targets.items():
+        q |= Q(**{source: a, f'{target}__in': bs})
+    return through._default_manager.filter(q).delete()[0]
+
+
+def clear_sources(field, source_pks):
+    """Delete every through row of the `source_pks`, in one query.
+    """
+    if len(source_pks) == 0:
+        return 0
+    through = field.remote_field.through
+    source, target = through_names(field)
+    q = Q(**{f'{source}__in': source_pks})
+    if is_symmetrical(field):
+        q |= Q(**{f'{target}__in': source_pks})
+    return through._default_manager.filter(q).delete()[0]
+
+
+def set_many(field, values, batch_size=None):
+    """Replace the relations of many objects; `values` is a dict of
+    `{source_pk: iterable of target pks}`. One delete and one insert.
+    """
+    clear_sources(field, tuple(values))
+    pairs = tuple((a, b) for a, bs in values.items() for b in bs)
+    return add_pairs(field, pairs, batch_size)
+
+
+def existing_targets(field, instance):
+    """Return the set of related pks of the instance, from the prefetched
+    objects if any, else one `values_list` query of the through model.
+    """
+    cache = getattr(instance, '_prefetched_objects_cache', {})
+    if field.name in cache:
+        return {x.pk for x in cache[field.name]}
+
+    through = field.remote_field.through
+    source, target = through_names(field)
+    queryset = through._default_manager.filter(**{source: instance.pk})
+    return set(queryset.values_list(target, flat=True))
+
+
+def save_delta(field, instance, targets, existing=None):
+    """Set the relations of the instance to the `targets` pks, writing only
+    the difference to the `existing` pks (read if `None`); at most one
+    delete and one insert. The `m2m_changed` signals are sent as `.set()`.
+    """
+    if existing is None:
+        existing = existing_targets(field, instance)
+    targets = set(targets)
+    removed = existing - targets
+    added = targets - existing
+
+    through = field.remote_field.through
+    signal = {
+        'sender': through,
+        'instance': instance,
+        'reverse': False,
+        'model': field.remote_field.model,
+        'using': instance._state.db,
+    }
+    if len(removed) > 0:
+        m2m_changed.send(action='pre_remove', pk_set=removed, **signal)
+        remove_pairs(field, tuple((instance.pk, x) for x in removed))
+        m2m_changed.send(action='post_remove', pk_set=removed, **signal)
+
+    if len(added) > 0:
+        m2m_changed.send(action='pre_add', pk_set=added, **signal)
+        add_pairs(field, tuple((instance.pk, x) for x in added))
+        m2m_changed.send(action='post_add', pk_set=added, **signal)
+
+    getattr(instance, '_prefetched_objects_cache', {}).pop(field.name, None)
+    return (added, removed, )
+
+
+def save_form_m2m(form, instance, created=False):
+    """As the `ModelForm` `save_m2m`, writing each m2m field by its
+    difference through `save_delta`. A `created` instance has no existing
+    relations to read.
+    """
+    cleaned_data = form.cleaned_data
+    fields = form._meta.fields
+    exclude = form._meta.exclude
+    opts = instance._meta
+
+    for f in chain(opts.many_to_many, opts.private_fields):
+        if not hasattr(f, 'save_form_data'):
+            continue
+        if fields and f.name not in fields:
+            continue
+        if exclude and f.name in exclude:
+            continue
+        if f.name not in cleaned_data:
+            continue
+
+        if f.many_to_many and is_bulk_field(f):
+            targets = tuple(x.pk for x in cleaned_data[f.name])
+            save_delta(f, instance, targets, existing=set() if created else None)
+            continue
+        f.save_form_data(instance, cleaned_data[f.name])
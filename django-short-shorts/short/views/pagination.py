@@ -0,0 +1,152 @@
+"""
+Keyset (seek) pagination for the generated list views.
+
+Rather than `LIMIT/OFFSET`, each page seeks from the last (or first) row
+of the previous page using the `cursor_field` and the `pk` as a tie-break:
+
+    SELECT ... WHERE (created > x) OR (created = x AND id > y)
+    ORDER BY created, id LIMIT 51
+
+The cost of a page stays constant deep into the table, as long as the
+`cursor_field` is indexed and not null. Prefix the field with a `-` for
+descending order, such as `-created` for the latest first:
+
+    shorts.crud_classes(paginate_by=25, cursor_field='-created')
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """A `Page` like object for the keyset page. There is no page number or
+    count, only the cursors for the next and previous pages.
+    """
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the list of values from the cursor token, or raise a
+    `ValueError` for a bad token.
+    """
+    pad = '=' * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + pad))
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {token}') from e
+
+    if isinstance(values, list) is False:
+        raise ValueError(f'Invalid cursor: {token}')
+    return values
+
+
+def key_fields(model, cursor_field):
+    """Return a tuple of `(name, field)` pairs for the seek key; the
+    `cursor_field` and the `pk` tie-break.
+    """
+    name = cursor_field.lstrip('-')
+    pk = model._meta.pk
+    if name in ('pk', pk.name):
+        return (('pk', pk,),)
+    return ((name, model._meta.get_field(name),), ('pk', pk,),)
+
+
+def key_ordering(model, cursor_field, reverse=False):
+    desc = cursor_field.startswith('-') != reverse
+    prefix = '-' if desc else ''
+    return tuple(f'{prefix}{name}' for name, field in key_fields(model, cursor_field))
+
+
+def seek_filter(names, values, op='gt'):
+    """Build the row comparison `(a, b) > (x, y)` as
+    `a > x OR (a = x AND b > y)`.
+    """
+    q = Q()
+    for i, name in enumerate(names):
+        eq = dict(zip(names[:i], values[:i]))
+        eq[f'{name}__{op}'] = values[i]
+        q |= Q(**eq)
+    return q
+
+
+def make_cursor(obj, fields):
+    return encode_cursor([f.value_to_string(obj) for name, f in fields])
+
+
+def keyset_query(queryset, cursor_field, size, after=None, before=None):
+    """Return the `(queryset, fields, forward, cursor)` of the keyset page;
+    the queryset is ordered, filtered and sliced to `size + 1` rows.
+    """
+    fields = key_fields(queryset.model, cursor_field)
+    names = tuple(name for name, f in fields)
+
+    forward = before is None
+    cursor = after if forward else before
+    ordering = key_ordering(queryset.model, cursor_field, reverse=not forward)
+    queryset = queryset.order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(fields):
+            raise ValueError(f'Invalid cursor: {cursor}')
+        try:
+            values = [f.to_python(v) for (name, f), v in zip(fields, values)]
+        except ValidationError as e:
+            raise ValueError(f'Invalid cursor: {cursor}') from e
+        op = 'lt' if ordering[0].startswith('-') else 'gt'
+        queryset = queryset.filter(seek_filter(names, values, op))
+
+    return (queryset[:size + 1], fields, forward, cursor,)
+
+
+def keyset_result(rows, size, fields, forward, cursor):
+    more = len(rows) > size
+    rows = rows[:size]
+
+    if forward:
+        has_next, has_previous = more, bool(cursor)
+    else:
+        rows.reverse()
+        has_next, has_previous = True, more
+
+    next_cursor = previous_cursor = None
+    if len(rows) > 0:
+        if has_next:
+            next_cursor = make_cursor(rows[-1], fields)
+        if has_previous:
+            previous_cursor = make_cursor(rows[0], fields)
+
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def keyset_page(queryset, cursor_field, size, after=None, before=None):
+    """Return a `KeysetPage` of `size` rows from the queryset, after or
+    before the given cursor tokens. Only `size + 1` rows are read.
+    """
+    queryset, fields, forward, cursor = keyset_query(queryset, cursor_field, size, after, before)
+    return keyset_result(list(queryset), size, fields, forward, cursor)
@@ -0,0 +1,49 @@
+"""
+Plan the `select_related` and `prefetch_related` of a generated view
+queryset, from the model `_meta`:
+
+    >>> related_plan(models.Product)
+    ((), ('urls', 'associated', 'location'))
+
+Forward foreign keys and one-to-one fields are joined with `select_related`,
+many-to-many fields are fetched in one query each with `prefetch_related`.
+Override per model through the `base_definition`:
+
+    shorts.crud_classes(select_related=('owner',), prefetch_related=False)
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def related_plan(model):
+    """Return a tuple of `(select_related, prefetch_related)` field names
+    for the model.
+    """
+    selects = ()
+    for field in model._meta.fields:
+        if field.is_relation and (field.many_to_one or field.one_to_one):
+            selects += (field.name, )
+
+    prefetches = tuple(field.name for field in model._meta.many_to_many)
+    return (selects, prefetches, )
+
+
+def apply_related(queryset, select_related=None, prefetch_related=None):
+    """Apply the related plan to the queryset. A `None` value uses the
+    discovered plan, `False` or an empty tuple applies nothing.
+    """
+    selects, prefetches = related_plan(queryset.model)
+
+    if select_related is not None:
+        selects = select_related or ()
+
+    if prefetch_related is not None:
+        prefetches = prefetch_related or ()
+
+    if len(selects) > 0:
+        queryset = queryset.select_related(*selects)
+
+    if len(prefetches) > 0:
+        queryset = queryset.prefetch_related(*prefetches)
+
+    return queryset
@@ -1,8 +1,14 @@
-from django.http import JsonResponse
+import json
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView, DetailView, TemplateView
 from django.core import serializers
 from django.core.serializers.python import Serializer
 
+from .conditional import ConditionalListMixin, ConditionalObjectMixin
+
 
 class JsonSerializer(Serializer):
     # pass
@@ -10,6 +16,14 @@ class JsonSerializer(Serializer):
     def get_dump_object(self, obj):
         return {}
 
+    def handle_field(self, obj, field):
+        # The row is built by get_dump_object; Skip the per field work,
+        # notably a query for every m2m field of every object.
+        pass
+
+    handle_fk_field = handle_field
+    handle_m2m_field = handle_field
+
     # def end_object( self, obj ):
     #     self._current['id'] = obj._get_pk_val()
     #     self._current.update(self.get_dump_object(obj) or {})
@@ -32,13 +46,87 @@ class JSONResponseMixin(object):
         """
         return context
 
+    def render_to_stream_response(self, prop, rows, stream_format='json'):
+        """
+        Returns a streaming response, writing each (dict) row of the `rows`
+        iterable as it arrives. The 'json' format is an object with a single
+        `prop` list: `{"object_list": [...]}`, 'ndjson' writes one row per line.
+        An async iterable of `rows` streams through an async iterator.
+        """
+        is_async = hasattr(rows, '__aiter__')
+        if stream_format == 'ndjson':
+            stream = self.astream_ndjson if is_async else self.stream_ndjson
+            content = stream(rows)
+            content_type = 'application/x-ndjson'
+        else:
+            stream = self.astream_json if is_async else self.stream_json
+            content = stream(prop, rows)
+            content_type = 'application/json'
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    def stream_json(self, prop, rows):
+        yield f'{{{json.dumps(prop)}: ['
+        sep = ''
+        for chunk in rows:
+            if len(chunk) == 0:
+                continue
+            yield sep + ','.join(self.dumps(x) for x in chunk)
+            sep = ','
+        yield ']}'
 
-class JsonListView(JSONResponseMixin, DetailView):
+    def stream_ndjson(self, rows):
+        for chunk in rows:
+            yield ''.join(f'{self.dumps(x)}\n' for x in chunk)
+
+    async def astream_json(self, prop, rows):
+        yield f'{{{json.dumps(prop)}: ['
+        sep = ''
+        async for chunk in rows:
+            if len(chunk) == 0:
+                continue
+            yield sep + ','.join(self.dumps(x) for x in chunk)
+            sep = ','
+        yield ']}'
+
+    async def astream_ndjson(self, rows):
+        async for chunk in rows:
+            yield ''.join(f'{self.dumps(x)}\n' for x in chunk)
+
+    def dumps(self, data):
+        return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+class JsonListView(ConditionalListMixin, JSONResponseMixin, DetailView):
     fields = None
     model = None
     prop = 'object_list'
+    # Stream the rows in chunks of `chunk_size`, rather than one response.
+    stream = False
+    # 'json' or 'ndjson'; The `?format=` query overrides the stream format.
+    stream_format = 'json'
+    format_kwarg = 'format'
+    chunk_size = 2000
 
-    def get_dump_object(self, obj):
+    # Read the rows as `values_list` tuples rather than model instances,
+    # skipping the serializer and `get_dump_object`.
+    use_values = False
+
+    # The query string API, pushed down to the queryset. Only the dump
+    # fields may be selected, filtered or ordered:
+    #   ?fields=id,name&order=-count&name=milk&count__in=1,2&limit=10
+    query_api = True
+    fields_kwarg = 'fields'
+    order_kwarg = 'order'
+    limit_kwarg = 'limit'
+    max_limit = 1000
+    filter_lookups = ('exact', 'in',)
+    selected_keys = None
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.selected_keys = self.get_selected_keys()
+
+    def get_field_keys(self):
         keys = self.fields or '__all__'
 
         if keys == '__all__':
@@ -46,33 +134,207 @@ class JsonListView(JSONResponseMixin, DetailView):
             for field in self.model._meta.fields:
                 r += (field.attname, )
             keys = r
+        return keys
+
+    def get_dump_keys(self):
+        return self.selected_keys or self.get_field_keys()
+
+    def get_query_fields(self):
+        """Return a dict of the model fields usable through the query api,
+        by the field name and attname.
+        """
+        keys = self.get_field_keys()
+        r = {}
+        for field in self.model._meta.fields:
+            if field.attname in keys:
+                r[field.name] = field
+                r[field.attname] = field
+        return r
+
+    def get_query_field(self, name):
+        field = self.get_query_fields().get(name)
+        if field is None:
+            raise BadRequest(f'Unknown field "{name}"')
+        return field
+
+    def get_selected_keys(self):
+        """Return a tuple of attnames from the `?fields=` query, or `None`.
+        """
+        value = self.request.GET.get(self.fields_kwarg)
+        if self.query_api is False or not value:
+            return None
+        return tuple(self.get_query_field(x).attname for x in value.split(','))
+
+    def get_filters(self):
+        """Return a dict of queryset filters from the `field=value` and
+        `field__in=a,b` query. Unknown fields are ignored.
+        """
+        reserved = (self.fields_kwarg, self.order_kwarg, self.limit_kwarg,
+                    self.format_kwarg,)
+        fields = self.get_query_fields()
+        filters = {}
+
+        for key, value in self.request.GET.items():
+            if key in reserved:
+                continue
+            name, _, lookup = key.partition('__')
+            field = fields.get(name)
+            if field is None:
+                continue
+
+            lookup = lookup or 'exact'
+            if lookup not in self.filter_lookups:
+                raise BadRequest(f'Unsupported lookup "{key}"')
+
+            try:
+                if lookup == 'in':
+                    value = [field.to_python(x) for x in value.split(',')]
+                else:
+                    value = field.to_python(value)
+            except ValidationError:
+                raise BadRequest(f'Invalid value for "{key}"')
+
+            filters[f'{field.name}__{lookup}'] = value
+        return filters
+
+    def get_order(self):
+        value = self.request.GET.get(self.order_kwarg)
+        if not value:
+            return ()
+
+        r = ()
+        for name in value.split(','):
+            desc = name.startswith('-')
+            field = self.get_query_field(name.lstrip('-'))
+            r += (f"{'-' if desc else ''}{field.name}", )
+        return r
+
+    def get_limit(self):
+        value = self.request.GET.get(self.limit_kwarg)
+        if not value:
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            raise BadRequest(f'Invalid limit "{value}"')
+        return max(0, min(limit, self.max_limit))
+
+    def only_selected(self, queryset):
+        if not self.selected_keys:
+            return queryset
+        fields = self.get_query_fields()
+        return queryset.only(*(fields[x].name for x in self.selected_keys))
+
+    def apply_query(self, queryset):
+        """Push the query string down to the queryset; filter, order,
+        defer the unselected fields, then limit.
+        """
+        if self.query_api is False:
+            return queryset
+
+        queryset = queryset.filter(**self.get_filters())
+
+        order = self.get_order()
+        if len(order) > 0:
+            queryset = queryset.order_by(*order)
+
+        queryset = self.only_selected(queryset)
+
+        limit = self.get_limit()
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
+
+    def get_dump_object(self, obj):
+        keys = self.get_dump_keys()
         return { x: getattr(obj, x) for x in keys}
 
     def get_results(self):
-        return self.model.objects.all()
+        return self.apply_query(self.model.objects.all())
+
+    def get_conditional_queryset(self):
+        return self.get_results()
 
     def get_serialiser(self):
         serial_data = JsonSerializer()
         serial_data.get_dump_object = self.get_dump_object
         return serial_data
 
+    def iter_values(self, result, chunk_size=None):
+        """Yield a dict per row of the queryset, without building model
+        instances.
+        """
+        keys = self.get_dump_keys()
+        rows = result.values_list(*keys)
+        if chunk_size is not None:
+            rows = rows.iterator(chunk_size=chunk_size)
+        for row in rows:
+            yield dict(zip(keys, row))
+
+    def serialize(self, result):
+        if self.use_values:
+            return list(self.iter_values(result))
+        return self.get_serialiser().serialize(result)
+
+    def get_stream_format(self):
+        value = self.request.GET.get(self.format_kwarg, self.stream_format)
+        return value if value in ('json', 'ndjson') else self.stream_format
+
+    def iter_chunks(self, result):
+        """Yield lists of serialized rows, reading the queryset with an
+        iterator of `chunk_size`, so only one chunk of objects exists in
+        memory.
+        """
+        if self.use_values:
+            rows = self.iter_values(result, self.chunk_size)
+            convert = list
+        else:
+            rows = result.iterator(chunk_size=self.chunk_size)
+            convert = self.get_serialiser().serialize
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield convert(chunk)
+                chunk = []
+        yield convert(chunk)
+
     def get(self, request, *args, **kwargs):
-        serial = self.get_serialiser()
+        if self.stream:
+            rows = self.iter_chunks(self.get_results())
+            return self.render_to_stream_response(self.prop, rows,
+                                                  self.get_stream_format())
+
         result = self.get_results()
-        r = serial.serialize(result)
+        r = self.serialize(result)
         data = {
             self.prop:r
         }
         return self.render_to_json_response(data, **kwargs)
 
 
-class JsonDetailView(JsonListView):
+class JsonDetailView(ConditionalObjectMixin, JsonListView):
     prop = 'object'
 
+    def get_conditional_queryset(self):
+        return self.model.objects.all()
+
     def get_results(self):
-        return self.model.objects.get(id=self.kwargs['pk'])
+        return self.only_selected(self.model.objects).get(id=self.kwargs['pk'])
+
+    def get_values_result(self):
+        keys = self.get_dump_keys()
+        row = self.model.objects.values_list(*keys).get(id=self.kwargs['pk'])
+        return dict(zip(keys, row))
 
     def get(self, request, *args, **kwargs):
+        if self.use_values:
+            data = {
+                self.prop: self.get_values_result()
+            }
+            return self.render_to_json_response(data, **kwargs)
+
         serial = self.get_serialiser()
         result = self.get_results()
         r = serial.serialize([result])
@@ -1,7 +1,14 @@
 # Generated by Django 3.2.10 on 2021-12-25 00:50
 
 from django.db import migrations, models
-import products.models
+import random
+import string
+
+
+def rand_str(length=6):
+    # The former products.models.rand_str default of the unique_id.
+    choices = random.choices(string.ascii_uppercase + string.digits, k=length)
+    return ''.join(choices)
 
 
 class Migration(migrations.Migration):
@@ -32,7 +39,7 @@ class Migration(migrations.Migration):
             fields=[
                 ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
                 ('name', models.CharField(blank=True, max_length=255, null=True)),
-                ('unique_id', models.CharField(blank=True, default=products.models.rand_str, max_length=255, null=True)),
+                ('unique_id', models.CharField(blank=True, default=rand_str, max_length=255, null=True)),
                 ('product_id', models.CharField(blank=True, max_length=255, null=True)),
                 ('description', models.TextField(blank=True, null=True)),
                 ('damaged', models.BooleanField(default=True)),
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from django.db import migrations
+
+import short.models.ids
+
+
+def fill_unique_ids(apps, schema_editor):
+    """Give the products without an id, or with a duplicate (or too long)
+    id, a new id before the unique index.
+    """
+    Product = apps.get_model('products', 'Product')
+    generator = short.models.ids.IdGenerator(12, monotonic=True)
+    seen = set()
+    changed = []
+    for product in Product.objects.only('pk', 'unique_id').order_by('pk'):
+        value = product.unique_id
+        if not value or value in seen or len(value) > 12:
+            product.unique_id = generator()
+            changed.append(product)
+        seen.add(product.unique_id)
+    Product.objects.bulk_update(changed, ['unique_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_auto_20211228_0307'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_unique_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='product',
+            name='unique_id',
+            field=short.models.ids.ShortIdField(monotonic=True),
+        ),
+    ]
@@ -1,13 +1,7 @@
 from django.db import models
-import string
-import random
 
 from short import shorts
 
-def rand_str(length=6):
-    choices = random.choices(string.ascii_uppercase + string.digits, k=length)
-    return ''.join(choices)
-
 
 class Hyperlink(models.Model):
     _short_props = ('name', 'url',)
@@ -29,17 +23,17 @@ class Location(models.Model):
 
 
 
-class Product(models.Model):
+class Product(shorts.ShortIdMixin, models.Model):
     _short_string = '"{self.name}" x{self.count}'
 
     name = shorts.chars()
-    unique_id = shorts.chars(default=rand_str)
+    unique_id = shorts.short_id(12, monotonic=True)
     product_id = shorts.chars()
     description = shorts.text()
     urls = shorts.m2m(Hyperlink)
     damaged = shorts.false_bool()
     in_use = shorts.false_bool()
-    created = shorts.dt_created()
+    created = shorts.dt_created(index=True)
     updated = shorts.dt_updated()
     count = shorts.integer(1)
     associated = shorts.m2m('self')
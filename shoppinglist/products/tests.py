@@ -1,3 +1,1171 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import types
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import BadRequest, ImproperlyConfigured
+from django.db import IntegrityError, connection
+from django.http import Http404
+from django.db import models as django_models
+from django.db.models.signals import pre_init
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from django.test.utils import isolate_apps
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve, reverse, set_script_prefix
+from django.urls.resolvers import RoutePattern, URLResolver
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views.generic.dates import YearArchiveView
+
+from short import (conf, context, datecache, fragments, grab_models, names, rollup, shorts,
+    signals, stats, templatememo, urls)
+from short.models import ids, indexes, registry
+from short.resolvers import TrieResolver
+from short.views import base as views_base, instrument, links, pagination
+from short.views.serialized import JsonListView, JsonDetailView
+
+from . import models
+
+
+class ProductListQueriesTest(TestCase):
+    """The generated ProductListView prefetches the M2M relations, so the
+    query count is constant regardless of the row count.
+    """
+
+    def make_products(self, count):
+        link = models.Hyperlink.objects.create(name='link', url='https://example.com')
+        location = models.Location.objects.create(name='shelf')
+        for i in range(count):
+            product = models.Product.objects.create(name=f'product {i}')
+            product.urls.add(link)
+            product.location.add(location)
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('products:product-list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_constant_queries(self):
+        self.make_products(2)
+        few = self.list_queries()
+
+        self.make_products(20)
+        many = self.list_queries()
+
+        self.assertEqual(few, many)
+
+    def test_prefetch_queries(self):
+        self.make_products(10)
+        # The conditional (ETag) aggregate, the page and one query per M2M;
+        # urls, associated, location
+        with self.assertNumQueries(5):
+            self.client.get(reverse('products:product-list'))
+
+
+class ProductConditionalTest(TestCase):
+
+    def test_not_modified(self):
+        product = models.Product.objects.create(name='product')
+        for url in (reverse('products:product-list'),
+                    reverse('products:product-detail', args=(product.pk,))):
+            response = self.client.get(url)
+            etag = response['ETag']
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_modified(self):
+        product = models.Product.objects.create(name='product')
+        url = reverse('products:product-detail', args=(product.pk,))
+        etag = self.client.get(url)['ETag']
+        product.name = 'changed'
+        product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_deleted(self):
+        # The Max(updated) of a list is unchanged by a delete; the list has
+        # only the ETag of the row count.
+        models.Product.objects.create(name='kept')
+        deleted = models.Product.objects.create(name='deleted')
+        url = reverse('products:product-list')
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response.headers)
+
+        deleted.delete()
+        since = http_date(time.time() + 60)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'deleted', response.content)
+
+
+class ProductBulkTest(TestCase):
+
+    def post(self, name, rows):
+        return self.client.post(reverse(f'products:product-{name}'),
+                                json.dumps(rows),
+                                content_type='application/json')
+
+    def test_bulk_create(self):
+        location = models.Location.objects.create(name='shelf')
+        rows = [{'name': f'product {i}', 'count': i, 'location': [location.pk]}
+                for i in range(50)]
+        # The locations, the savepoint, the id savepoint, the insert, the id
+        # release, the location through insert and the release.
+        with self.assertNumQueries(7):
+            response = self.post('bulkcreate', rows)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['count'], 50)
+        self.assertEqual(location.product_set.count(), 50)
+
+    def test_bulk_create_collision(self):
+        existing = models.Product.objects.create(name='existing')
+        field = models.Product._meta.get_field('unique_id')
+        generator = field.generator
+        values = iter([existing.unique_id, 'NEW000000001', 'NEW000000002', 'NEW000000003'])
+        field.generator = lambda: next(values)
+        try:
+            response = self.post('bulkcreate', [{'name': 'one'}, {'name': 'two'}])
+        finally:
+            field.generator = generator
+        self.assertEqual(response.status_code, 201)
+        products = models.Product.objects.filter(pk__in=response.json()['pks'])
+        self.assertEqual(sorted(x.unique_id for x in products), ['NEW000000002', 'NEW000000003'])
+
+    def test_bulk_create_invalid(self):
+        response = self.post('bulkcreate', [{'name': 'ok'}, {'count': 'many'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        self.assertEqual(models.Product.objects.count(), 0)
+
+    def test_bulk_update(self):
+        products = [models.Product.objects.create(name=f'product {i}') for i in range(20)]
+        rows = [{'pk': x.pk, 'count': 7} for x in products]
+        # The select, the savepoint, the update and the release.
+        with self.assertNumQueries(4):
+            response = self.post('bulkupdate', rows)
+        self.assertEqual(response.status_code, 200)
+        counts = models.Product.objects.values_list('name', 'count')
+        self.assertEqual(set(counts), {(x.name, 7) for x in products})
+
+    def test_bulk_delete(self):
+        products = [models.Product.objects.create(name=f'product {i}') for i in range(5)]
+        response = self.post('bulkdelete', [x.pk for x in products[:3]])
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(models.Product.objects.count(), 2)
+
+
+class ProductM2MDeltaTest(TestCase):
+    """The generated Create/UpdateView write only the m2m difference, with
+    one delete and one insert for each changed relation.
+    """
+
+    def setUp(self):
+        self.links = [models.Hyperlink.objects.create(name=f'link {i}', url='https://example.com')
+                      for i in range(3)]
+        self.locations = [models.Location.objects.create(name=f'shelf {i}') for i in range(3)]
+        self.other = models.Product.objects.create(name='other')
+
+    def data(self, **kw):
+        data = {
+            'name': 'product',
+            'count': 2,
+            'urls': [self.links[1].pk, self.links[2].pk],
+            'associated': [self.other.pk],
+            'location': [self.locations[1].pk, self.locations[2].pk],
+        }
+        data.update(kw)
+        return data
+
+    def test_create_queries(self):
+        # The three m2m choices, the savepoint, the insert, an insert for
+        # each m2m and the release.
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('products:product-create'), self.data())
+        self.assertEqual(response.status_code, 302)
+
+        product = models.Product.objects.get(name='product')
+        self.assertEqual(set(product.urls.all()), set(self.links[1:]))
+        self.assertEqual(set(self.other.associated.all()), {product})
+
+    def test_update_queries(self):
+        product = models.Product.objects.create(name='product')
+        product.urls.set(self.links[:2])
+        product.location.set(self.locations[:1])
+        url = reverse('products:product-update', args=(product.pk,))
+
+        # The object and its three prefetches, the three m2m choices, the
+        # savepoint, the update, the urls delete and insert, the associated
+        # insert, the location delete and insert and the release.
+        with self.assertNumQueries(15):
+            response = self.client.post(url, self.data())
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(set(product.urls.all()), set(self.links[1:]))
+        self.assertEqual(set(product.location.all()), set(self.locations[1:]))
+
+        # Unchanged relations write nothing; the object, three prefetches, two
+        # m2m choices, the savepoint, the update, one associated delete (of
+        # both symmetrical rows) and the release.
+        with self.assertNumQueries(10):
+            self.client.post(url, self.data(associated=[]))
+        self.assertEqual(list(self.other.associated.all()), [])
+
+
+class ProductShortIdTest(TestCase):
+    """The Product `unique_id` is generated, time ordered and retried on a
+    collision.
+    """
+
+    def test_generated(self):
+        first = models.Product.objects.create(name='first')
+        second = models.Product.objects.create(name='second')
+        self.assertEqual(len(first.unique_id), 12)
+        self.assertLessEqual(first.unique_id[:8], second.unique_id[:8])
+
+        objs = ids.bulk_create(models.Product, [models.Product(name=f'p{i}') for i in range(20)])
+        self.assertEqual(len({x.unique_id for x in objs}), 20)
+
+    def test_collision(self):
+        existing = models.Product.objects.create(name='existing')
+        field = models.Product._meta.get_field('unique_id')
+        generator = field.generator
+        values = iter([existing.unique_id, 'NEW000000001'])
+        field.generator = lambda: next(values)
+        try:
+            product = models.Product.objects.create(name='product')
+        finally:
+            field.generator = generator
+        self.assertEqual(product.unique_id, 'NEW000000001')
+
+    def test_no_savepoint(self):
+        # A single insert in a transaction, without a SAVEPOINT and RELEASE.
+        with self.assertNumQueries(1):
+            models.Product.objects.create(name='product')
+
+    def test_is_collision(self):
+        fields = (models.Product._meta.get_field('unique_id'),)
+        for message, expected in (
+            ('UNIQUE constraint failed: products_product.unique_id', True),
+            ('duplicate key value violates unique constraint "products_product_unique_id_key"\n'
+             'DETAIL:  Key (unique_id)=(7QZ3K0M1X8AF) already exists.', True),
+            ("Duplicate entry '7QZ3K0M1X8AF' for key 'products_product.unique_id'", True),
+            ('NOT NULL constraint failed: products_product.unique_id', False),
+            ('UNIQUE constraint failed: products_product.name', False),
+            ('FOREIGN KEY constraint failed', False),
+        ):
+            error = IntegrityError(message)
+            self.assertEqual(ids.is_collision(error, fields), expected, message)
+
+
+class IndexHintTest(TestCase):
+    """The field helper `index` option declares the single or composite
+    index; the history views warn on an unindexed date field.
+    """
+
+    def test_product_created(self):
+        self.assertTrue(indexes.is_indexed(models.Product, 'created'))
+        self.assertFalse(indexes.is_indexed(models.Product, 'updated'))
+
+    @isolate_apps('products')
+    def test_composite(self):
+        class Entry(django_models.Model):
+            name = shorts.chars(index=('-updated',))
+            updated = shorts.dt_updated(index=('name', '-updated',))
+            count = shorts.integer(1, index=True)
+
+        self.assertEqual([x.fields for x in Entry._meta.indexes],
+                         [['name', '-updated']])
+        self.assertTrue(Entry._meta.indexes[0].name)
+        self.assertTrue(Entry._meta.get_field('count').db_index)
+
+        with self.assertWarns(indexes.UnindexedWarning):
+            views_base.check_date_index(Entry, 'updated')
+        self.assertTrue(views_base.check_date_index(models.Product, 'created'))
+
+
+class ProductRollupTest(TestCase):
+    """The date buckets follow the saves and deletes, and the archive views
+    read the date list from the buckets.
+    """
+
+    def setUp(self):
+        rollup.register(models.Product, 'created')
+        self.addCleanup(rollup.unregister, models.Product, 'created')
+
+    def years(self):
+        return rollup.buckets(models.Product, 'created', 'year')
+
+    def test_buckets(self):
+        first = models.Product.objects.create(name='first')
+        second = models.Product.objects.create(name='second')
+        this_year = first.created.date().replace(month=1, day=1)
+        self.assertEqual(self.years(), [(this_year, 2)])
+
+        second.created = second.created - datetime.timedelta(days=400)
+        second.save()
+        second_year = second.created.date().replace(month=1, day=1)
+        self.assertEqual(self.years(), [(second_year, 1), (this_year, 1)])
+
+        models.Product.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.years(), [(second_year, 1)])
+
+        rollup.rebuild(models.Product, 'created')
+        self.assertEqual(self.years(), [(second_year, 1)])
+        self.assertEqual(len(rollup.buckets(models.Product, 'created', 'day')), 1)
+
+    def test_bulk_views(self):
+        def post(name, rows):
+            return self.client.post(reverse(f'products:product-{name}'),
+                                    json.dumps(rows), content_type='application/json')
+
+        def assert_totals():
+            count = models.Product.objects.count()
+            for period in rollup.PERIODS:
+                rows = rollup.buckets(models.Product, 'created', period)
+                self.assertEqual(sum(x[1] for x in rows), count, period)
+
+        pks = post('bulkcreate', [{'name': f'product {i}'} for i in range(6)]).json()['pks']
+        assert_totals()
+        post('bulkupdate', [{'pk': x, 'count': 2} for x in pks[:3]])
+        assert_totals()
+        post('bulkdelete', pks[:4])
+        assert_totals()
+        self.assertEqual(models.Product.objects.count(), 2)
+
+    def test_archive_date_list(self):
+        from products import views
+
+        product = models.Product.objects.create(name='product')
+        view_class = type('RollupIndexView', (views.ProductArchiveIndexView,), {'rollup': True})
+        view = view_class()
+        view.setup(RequestFactory().get('/'))
+
+        # The (not allow_empty) object list and its three prefetches, and
+        # the buckets rather than a grouping of the table.
+        with self.assertNumQueries(5):
+            date_list, qs, extra = view.get_dated_items()
+        self.assertEqual([x.year for x in date_list], [product.created.year])
+        self.assertEqual(list(view.date_counts.values()), [1])
+
+
+class ProductDateCacheTest(TestCase):
+    """The archive views with a `date_cache` cache the date list, until a
+    row date changes.
+    """
+
+    def setUp(self):
+        from products import views
+
+        self.addCleanup(datecache.unregister, models.Product, 'created')
+        self.view_class = type('CachedYearView', (views.ProductYearArchiveView,),
+                               {'date_cache': 'default'})
+
+    def post(self, name, rows):
+        return self.client.post(reverse(f'products:product-{name}'),
+                                json.dumps(rows), content_type='application/json')
+
+    def get_dated_items(self, view_class, **kwargs):
+        view = view_class()
+        view.setup(RequestFactory().get('/'), **kwargs)
+        with CaptureQueriesContext(connection) as ctx:
+            date_list, qs, extra = view.get_dated_items()
+        grouped = [x for x in ctx.captured_queries if 'GROUP BY' in x['sql']]
+        return (list(date_list), view.date_counts, len(grouped),)
+
+    def test_year_list(self):
+        product = models.Product.objects.create(name='product')
+        year = str(product.created.year)
+        date_list, counts, grouped = self.get_dated_items(self.view_class, year=year)
+        self.assertEqual(grouped, 1)
+        self.assertEqual(date_list, list(models.Product.objects.datetimes('created', 'month')))
+        self.assertEqual(list(counts.values()), [1])
+
+        # A save of other fields keeps the list.
+        product.name = 'changed'
+        product.save(update_fields=['name'])
+        self.assertEqual(self.get_dated_items(self.view_class, year=year)[2], 0)
+
+        models.Product.objects.create(name='other')
+        date_list, counts, grouped = self.get_dated_items(self.view_class, year=year)
+        self.assertEqual(grouped, 1)
+        self.assertEqual(list(counts.values()), [2])
+
+    def test_bulk_views(self):
+        product = models.Product.objects.create(name='product')
+        year = str(product.created.year)
+        self.get_dated_items(self.view_class, year=year)
+
+        pks = self.post('bulkcreate', [{'name': 'one'}, {'name': 'two'}]).json()['pks']
+        date_list, counts, grouped = self.get_dated_items(self.view_class, year=year)
+        self.assertEqual(grouped, 1)
+        self.assertEqual(list(counts.values()), [3])
+
+        self.post('bulkdelete', pks)
+        date_list, counts, grouped = self.get_dated_items(self.view_class, year=year)
+        self.assertEqual(list(counts.values()), [1])
+
+    def test_time_zone(self):
+        product = models.Product.objects.create(name='product')
+        year = str(product.created.year)
+        self.get_dated_items(self.view_class, year=year)
+        # The months of another time zone are another list.
+        with timezone.override('Pacific/Kiritimati'):
+            self.assertEqual(self.get_dated_items(self.view_class, year=year)[2], 1)
+        self.assertEqual(self.get_dated_items(self.view_class, year=year)[2], 0)
+
+    def test_evicted_generation(self):
+        product = models.Product.objects.create(name='product')
+        year = str(product.created.year)
+        self.get_dated_items(self.view_class, year=year)
+        # A lost generation key starts a new generation, not the first one.
+        caches['default'].delete(datecache.generation_key(models.Product, 'created'))
+        self.assertEqual(self.get_dated_items(self.view_class, year=year)[2], 1)
+
+    def test_default_off(self):
+        from products import views
+
+        self.assertIsNone(views.ProductYearArchiveView.date_cache)
+
+
+class ProductAsyncViewsTest(TestCase):
+    """The `async_views=True` list, detail and delete views read through
+    the async ORM.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        views = views_base.crud(models.Product, __name__, async_views=True)
+        cls.list_view, cls.detail_view, cls.delete_view = (views[0], views[3], views[4],)
+
+    async def test_views(self):
+        factory = AsyncRequestFactory()
+        product = await models.Product.objects.acreate(name='product')
+        self.assertTrue(self.list_view.view_is_async)
+
+        response = await self.list_view.as_view()(factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context_data['object_list']), [product])
+
+        response = await self.detail_view.as_view()(factory.get('/'), pk=product.pk)
+        self.assertEqual(response.context_data['object'], product)
+
+        response = await self.delete_view.as_view()(factory.post('/'), pk=product.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(await models.Product.objects.acount(), 0)
+
+
+class ProductViewStatsTest(TestCase):
+    """The views with `view_stats=True` record the time, queries and size
+    of each request.
+    """
+
+    def setUp(self):
+        self.list_view, *others = views_base.crud(models.Product, __name__, view_stats=True)
+        self.detail_view = others[2]
+
+    def test_default_off(self):
+        from products import views
+
+        self.assertNotIn(instrument.ViewStatsMixin, views.ProductListView.__mro__)
+
+    def test_list_stats(self):
+        name = self.list_view.get_stats_name()
+        self.assertEqual(name, f'{__name__}.ProductListView')
+        stats.reset()
+        models.Product.objects.create(name='product')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.list_view.as_view()(RequestFactory().get('/'))
+            response.render()
+
+        row = stats.registry[name]
+        self.assertGreater(row.generated, 0)
+        self.assertEqual(row.requests, 1)
+        self.assertEqual(row['queries'].sum, len(ctx))
+        self.assertEqual(row['size'].sum, len(response.content))
+        self.assertGreater(row['render'].sum, 0)
+        self.assertIn(f'short_view_seconds_count{{view="{name}"}} 1', stats.prometheus_text())
+        self.assertIsNone(instrument.current_probe.get())
+
+    def test_execute_wrappers(self):
+        # The count_query wrapper is entered per request, and leaves the
+        # wrappers of the caller in place.
+        marker = lambda execute, *args: execute(*args)
+        with connection.execute_wrapper(marker):
+            response = self.list_view.as_view()(RequestFactory().get('/'))
+            self.assertEqual(connection.execute_wrappers, [marker])
+            response.render()
+            self.assertEqual(connection.execute_wrappers, [marker])
+        self.assertEqual(connection.execute_wrappers, [])
+
+    async def test_async_stats(self):
+        list_view = views_base.crud(models.Product, __name__, async_views=True, view_stats=True)[0]
+        stats.reset()
+        await models.Product.objects.acreate(name='product')
+        response = await list_view.as_view()(AsyncRequestFactory().get('/'))
+        await sync_to_async(response.render)()
+        row = stats.registry[list_view.get_stats_name()]
+        self.assertGreater(row['queries'].sum, 0)
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_probe_reset(self):
+        view = self.detail_view.as_view()
+        with self.assertRaises(Http404):
+            view(RequestFactory().get('/'), pk=0)
+        self.assertIsNone(instrument.current_probe.get())
+
+
+class TemplateMemoTest(TestCase):
+    """The template names of a generated view are selected once."""
+
+    def test_list_template(self):
+        from products import views
+
+        templatememo.clear()
+        names = templatememo.template_names(views.ProductListView)
+        self.assertEqual(len(names), len(set(names)))
+
+        self.client.get(reverse('products:product-list'))
+        template = templatememo._templates[(None, tuple(names),)]
+        response = self.client.get(reverse('products:product-list'))
+        self.assertIs(response.template_name, template)
+        self.assertEqual(len(templatememo._templates), 1)
+
+        resolved = templatememo.warm([views.ProductListView, views.ProductDetailView])
+        self.assertIs(resolved[views.ProductListView], template)
+
+
+class KeysetPaginationTest(TestCase):
+    """The keyset pages seek through the rows with the next and previous
+    cursors.
+    """
+
+    def setUp(self):
+        self.products = [models.Product.objects.create(name=f'product {i}') for i in range(5)]
+
+    def walk(self, cursor_field, size=2):
+        queryset = models.Product.objects.all()
+        page = pagination.keyset_page(queryset, cursor_field, size)
+        pages = [page]
+        while page.has_next():
+            page = pagination.keyset_page(queryset, cursor_field, size, after=page.next_cursor)
+            pages.append(page)
+        return pages
+
+    def test_next_previous(self):
+        pages = self.walk('pk')
+        self.assertEqual([[x.pk for x in p] for p in pages],
+                         [[x.pk for x in self.products[i:i + 2]] for i in (0, 2, 4)])
+        self.assertFalse(pages[0].has_previous())
+        self.assertFalse(pages[-1].has_next())
+
+        previous = pagination.keyset_page(models.Product.objects.all(), 'pk', 2,
+                                          before=pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+        self.assertTrue(previous.has_next())
+        self.assertTrue(previous.has_previous())
+
+    def test_equal_created_tie_break(self):
+        # Every row has the same timestamp; the pk orders and seeks.
+        models.Product.objects.update(created=self.products[0].created)
+        pages = self.walk('-created')
+        rows = [x.pk for p in pages for x in p]
+        self.assertEqual(rows, sorted((x.pk for x in self.products), reverse=True))
+
+    def test_bad_cursor(self):
+        from products import views
+
+        view = views.ProductListView.as_view()
+        for cursor in ('nonsense', pagination.encode_cursor(['a', 'b', 'c'])):
+            with self.assertRaises(Http404):
+                view(RequestFactory().get('/', {'after': cursor}))
+
+    def page_rows(self, view_class, **params):
+        response = view_class.as_view()(RequestFactory().get('/', params))
+        return [x.pk for x in response.context_data['object_list']]
+
+    def test_view_ordering(self):
+        from products import views
+
+        # The ordering of the view is the keyset.
+        view_class = type('OrderedListView', (views.ProductListView,),
+                          {'ordering': ('-created',), 'paginate_by': 2})
+        rows = sorted(self.products, key=lambda x: (x.created, x.pk), reverse=True)
+        self.assertEqual(self.page_rows(view_class), [x.pk for x in rows[:2]])
+
+        # Another field, or the pk in the other direction.
+        for ordering in (('name',), ('-created', 'name',), ('-created', 'pk',),):
+            view_class = type('ConflictListView', (views.ProductListView,),
+                              {'ordering': ordering, 'cursor_field': '-created'})
+            with self.assertRaises(ImproperlyConfigured):
+                self.page_rows(view_class)
+
+    def test_empty_cursor(self):
+        from products import views
+
+        view_class = type('PairListView', (views.ProductListView,), {'paginate_by': 2})
+        first = self.page_rows(view_class)
+        self.assertEqual(first, [x.pk for x in self.products[:2]])
+        self.assertEqual(self.page_rows(view_class, before=''), first)
+        self.assertEqual(self.page_rows(view_class, after=''), first)
+
+
+class JsonStreamTest(TestCase):
+    """The streamed JSON list writes the rows of each chunk, as one JSON
+    object or a line per row with `?format=ndjson`.
+    """
+
+    def setUp(self):
+        for i in range(4):
+            models.Product.objects.create(name=f'product {i}', count=i)
+        self.definition = {'model': models.Product, 'fields': ('id', 'name', 'count',)}
+        self.view_class = type('ProductStreamView', (JsonListView,),
+                               dict(self.definition, stream=True, chunk_size=2))
+
+    def get(self, view_class, **params):
+        return view_class.as_view()(RequestFactory().get('/', params))
+
+    def test_json(self):
+        response = self.get(self.view_class)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        content = b''.join(response.streaming_content)
+
+        # The same rows as the single response; The last chunk is empty.
+        whole = self.get(type('ProductJsonView', (JsonListView,), self.definition))
+        self.assertEqual(json.loads(content), json.loads(whole.content))
+        self.assertEqual(len(json.loads(content)['object_list']), 4)
+
+    def test_ndjson(self):
+        response = self.get(self.view_class, format='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(x) for x in lines]
+        self.assertEqual(sorted(x['count'] for x in rows), [0, 1, 2, 3])
+        self.assertEqual(set(rows[0]), {'id', 'name', 'count'})
+
+    def test_unknown_format(self):
+        response = self.get(self.view_class, format='xml')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))['object_list']), 4)
+
+
+class JsonValuesTest(TestCase):
+    """The `use_values` rows match the serializer rows of the JSON views."""
+
+    def setUp(self):
+        self.product = models.Product.objects.create(name='product', count=3,
+                                                     description='fresh')
+        models.Product.objects.create(name='other', damaged=True)
+        self.definition = {
+            'model': models.Product,
+            'fields': ('id', 'name', 'unique_id', 'count', 'damaged', 'description',
+                       'created', 'updated',),
+        }
+
+    def assert_same(self, base, params=None, **kwargs):
+        contents = []
+        for use_values in (False, True):
+            view_class = type('ProductValuesView', (base,), dict(self.definition,
+                                                                 use_values=use_values))
+            response = view_class.as_view()(RequestFactory().get('/', params or {}), **kwargs)
+            content = b''.join(response.streaming_content) if response.streaming \
+                else response.content
+            contents.append(json.loads(content))
+        self.assertEqual(contents[0], contents[1])
+        return contents[1]
+
+    def test_list(self):
+        data = self.assert_same(JsonListView)
+        self.assertEqual(len(data['object_list']), 2)
+        data = self.assert_same(JsonListView, {'fields': 'name,count', 'order': 'count'})
+        self.assertEqual(data['object_list'][0], {'name': 'other', 'count': 1})
+
+    def test_stream(self):
+        self.definition['stream'] = True
+        self.assertEqual(len(self.assert_same(JsonListView)['object_list']), 2)
+
+    def test_detail(self):
+        data = self.assert_same(JsonDetailView, pk=self.product.pk)
+        self.assertEqual(data['object']['unique_id'], self.product.unique_id)
+
+
+class JsonQueryTest(TestCase):
+    """The JSON list query string selects, filters, orders and limits the
+    rows in the query, over the view `fields` only.
+    """
+
+    def setUp(self):
+        for name, count in (('milk', 2), ('bread', 1), ('eggs', 12), ('tea', 1),):
+            models.Product.objects.create(name=name, count=count)
+        self.view_class = type('ProductQueryView', (JsonListView,), {
+            'model': models.Product,
+            'fields': ('id', 'name', 'count',),
+            'max_limit': 3,
+        })
+
+    def get(self, **params):
+        response = self.view_class.as_view()(RequestFactory().get('/', params))
+        return json.loads(response.content)['object_list']
+
+    def test_fields_order_limit(self):
+        rows = self.get(fields='name,count', order='-count,name', limit='2')
+        self.assertEqual(rows, [{'name': 'eggs', 'count': 12}, {'name': 'milk', 'count': 2}])
+        self.assertEqual(len(self.get(limit='100')), 3)
+
+    def test_filters(self):
+        self.assertEqual([x['name'] for x in self.get(name='milk')], ['milk'])
+        rows = self.get(count__in='1,12', order='name', fields='name')
+        self.assertEqual(rows, [{'name': 'bread'}, {'name': 'eggs'}, {'name': 'tea'}])
+        # Not a query field; ignored.
+        self.assertEqual(len(self.get(description='none')), 4)
+
+    def test_pushed_down(self):
+        # The ETag aggregate and the rows.
+        with self.assertNumQueries(2):
+            self.get(fields='name', count='1', order='name', limit='1')
+
+    def test_bad_requests(self):
+        view = self.view_class.as_view()
+        for params in (
+            {'fields': 'name,description'},
+            {'order': 'created'},
+            {'limit': 'ten'},
+            {'name__contains': 'mil'},
+            {'count': 'many'},
+            {'count__in': '1,x'},
+        ):
+            with self.assertRaises(BadRequest, msg=params):
+                view(RequestFactory().get('/', params))
+
+    def test_query_api_off(self):
+        self.view_class.query_api = False
+        self.assertEqual(len(self.get(name='milk', limit='1', fields='nope')), 4)
+
+
+class RowCacheTest(TestCase):
+    """The cached list rows of a product are dropped on its save, delete
+    and m2m changes from either side.
+    """
+
+    def setUp(self):
+        fragments.register(models.Product, 'default')
+        self.addCleanup(fragments._registry.pop, models.Product, None)
+        self.product = models.Product.objects.create(name='product')
+        # A copy with the cached updated value, unchanged by the writes.
+        self.stale = models.Product.objects.get(pk=self.product.pk)
+        self.assertEqual(self.render(), 1)
+        self.assertEqual(self.render(), 0)
+
+    def render(self):
+        """Render the stale row; return the renders, 0 for a cached row."""
+        calls = []
+        rows = fragments.RowCache(models.Product, 'default', 'updated', [self.stale])
+        rows.render(self.stale, 'list', lambda: calls.append(1) or '<li>product</li>')
+        return len(calls)
+
+    def test_save(self):
+        self.product.name = 'changed'
+        self.product.save()
+        self.assertEqual(self.render(), 1)
+
+    def test_delete(self):
+        self.product.delete()
+        self.assertEqual(self.render(), 1)
+
+    def test_evicted_generation(self):
+        # A lost generation key starts a new generation, not the first one.
+        caches['default'].delete(fragments.generation_key(models.Product))
+        self.assertEqual(self.render(), 1)
+        self.assertEqual(self.render(), 0)
+        caches['default'].delete(fragments.generation_key(models.Product))
+        fragments.invalidate(models.Product)
+        self.assertEqual(self.render(), 1)
+
+    def test_m2m(self):
+        location = models.Location.objects.create(name='shelf')
+        self.product.location.add(location)
+        self.assertEqual(self.render(), 1)
+        self.assertEqual(self.render(), 0)
+
+        location.product_set.remove(self.product)
+        self.assertEqual(self.render(), 1)
+        self.assertEqual(self.render(), 0)
+
+        # A clear of the other side has no pks; all rows are dropped.
+        location.product_set.clear()
+        self.assertEqual(self.render(), 1)
+
+    def test_other_model(self):
+        models.Location.objects.create(name='shelf')
+        self.assertEqual(self.render(), 0)
+
+
+class ShortLinksTest(TestCase):
+    """The `short_links` urls, reversed once with a sentinel pk, match the
+    `reverse` of each url name.
+    """
+
+    def test_reverse(self):
+        short_links = links.Links('products', 'Product')
+        for name in ('detail', 'update', 'delete',):
+            for pk in (3, 1234567890, 'a b~c',):
+                self.assertEqual(short_links.url(name, pk),
+                                 reverse(f'products:product-{name}', args=(pk,)))
+        for name in ('list', 'create',):
+            self.assertEqual(short_links.url(name), reverse(f'products:product-{name}'))
+
+    def test_script_prefix(self):
+        short_links = links.Links('products', 'Product')
+        short_links.url('detail', 1)
+        set_script_prefix('/shop/')
+        try:
+            self.assertEqual(short_links.url('detail', 1), reverse('products:product-detail', args=(1,)))
+            self.assertTrue(short_links.url('detail', 1).startswith('/shop/'))
+        finally:
+            set_script_prefix('/')
+
+    def test_context(self):
+        product = models.Product.objects.create(name='product')
+        response = self.client.get(reverse('products:product-list'))
+        short_links = response.context['short_links']
+        self.assertEqual(short_links.url('detail', product.pk),
+                         reverse('products:product-detail', args=(product.pk,)))
+        self.assertContains(response, short_links.url('detail', product.pk))
+
+
+class AppnameContextTest(TestCase):
+    """The lazy `appname` context value reads the resolved request, and
+    resolves other paths once, on use.
+    """
+
+    def setUp(self):
+        context.resolve_appname.cache_clear()
+
+    def test_resolver_match(self):
+        path = reverse('products:product-list')
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        self.assertEqual(str(context.appname(request)['appname']), 'products')
+        self.assertEqual(context.resolve_appname.cache_info().currsize, 0)
+
+    def test_lazy(self):
+        request = RequestFactory().get(reverse('products:product-list'))
+        value = context.appname(request)['appname']
+        self.assertEqual(context.resolve_appname.cache_info().misses, 0)
+        self.assertEqual(str(value), 'products')
+        self.assertEqual(str(context.appname(request)['appname']), 'products')
+        self.assertEqual(context.resolve_appname.cache_info().misses, 1)
+        self.assertEqual(context.resolve_appname.cache_info().hits, 1)
+
+    def test_unknown_path(self):
+        request = RequestFactory().get('/no/such/path/')
+        self.assertEqual(str(context.appname(request)['appname']), '')
+
+    def test_template(self):
+        response = self.client.get(reverse('products:product-list'))
+        self.assertEqual(str(response.context['appname']), 'products')
+
+
+class LazyViewsTest(TestCase):
+    """A lazy views module generates the view classes of a model on the
+    first access of any one of them, through the module `__getattr__`.
+    """
+
+    def setUp(self):
+        self.name = f'{__name__}_lazy_views'
+        self.module = types.ModuleType(self.name)
+        self.module.__getattr__ = self.fallback
+        sys.modules[self.name] = self.module
+        self.addCleanup(sys.modules.pop, self.name, None)
+        self.addCleanup(views_base._lazy_views.pop, self.name, None)
+
+    def fallback(self, name):
+        if name == 'other':
+            return 'fallback'
+        raise AttributeError(name)
+
+    def test_crud(self):
+        names = views_base.crud(models.Product, self.name, lazy=True)
+        self.assertIn('ProductListView', names)
+        self.assertNotIn('ProductListView', vars(self.module))
+        self.assertIsNotNone(views_base.pending_view(self.name, 'ProductDetailView'))
+
+        view_class = self.module.ProductDetailView
+        self.assertEqual(view_class.__name__, 'ProductDetailView')
+        self.assertEqual(view_class.__module__, self.name)
+        # All the views of the call are generated, once.
+        for name in names:
+            self.assertIn(name, vars(self.module))
+            self.assertIsNone(views_base.pending_view(self.name, name))
+        self.assertIs(self.module.ProductDetailView, view_class)
+
+    def test_other_names(self):
+        views_base.history(models.Product, self.name, lazy=True)
+        self.assertEqual(self.module.other, 'fallback')
+        with self.assertRaises(AttributeError):
+            self.module.ProductMissingView
+        self.assertNotIn('ProductYearArchiveView', vars(self.module))
+        self.assertTrue(issubclass(self.module.ProductYearArchiveView, YearArchiveView))
+
+
+class RouteCompileTest(TestCase):
+    """The single pass `compile_routes` and `build_paths` give the url
+    patterns of `paths_less`.
+    """
+
+    def entries(self, patterns):
+        return [(str(x.pattern), x.name, x.callback.view_class) for x in patterns]
+
+    def test_paths_less(self):
+        from products import views
+
+        view_names = names.crud() + names.bulk() + names.history()
+        model_list = grab_models(models)
+        less = urls.paths_less(views, model_list, ignore_missing_views=True,
+                               **{x: names.get_url(x) for x in view_names})
+        default = urls.paths_default(views, model_list, views=view_names, trie=False)
+        self.assertEqual(self.entries(default), self.entries(less))
+
+    def test_compile_routes(self):
+        from products import views
+
+        routes = urls.compile_routes(views, models.Product, views=('list', 'detail',))
+        self.assertEqual(routes, (
+            ('product/list/', 'product-list', 'ProductListView'),
+            ('product/detail/<str:pk>/', 'product-detail', 'ProductDetailView'),
+        ))
+        entries = self.entries(urls.build_paths(views, routes))
+        self.assertEqual(entries, [
+            ('product/list/', 'product-list', views.ProductListView),
+            ('product/detail/<str:pk>/', 'product-detail', views.ProductDetailView),
+        ])
+
+    def test_missing_views(self):
+        module = types.ModuleType('no_views')
+        self.assertEqual(urls.compile_routes(module, models.Product), ())
+        with self.assertRaises(AttributeError):
+            urls.compile_routes(module, models.Product, ignore_missing_views=False)
+
+
+class ModelRegistryTest(TestCase):
+    """The model index gives the models of the app registry and module
+    walks, and is cleared by a newly prepared model class.
+    """
+
+    def test_lookups(self):
+        walked = tuple(x for name, x in registry.module_pairs(models))
+        self.assertEqual(registry.models_for_module('products.models'), walked)
+        self.assertEqual(grab_models(models), walked)
+        self.assertIn(models.Product, walked)
+        self.assertNotIn(models.Product, grab_models(models, ignore=('Product',)))
+        self.assertNotIn(models.Product, grab_models(models, ignore=(models.Product,)))
+
+        self.assertEqual(set(registry.models_for_label('products')),
+                         set(apps.get_app_config('products').get_models(include_auto_created=True)))
+        self.assertIn(models.Product.location.through, registry.models_for_package('products'))
+        self.assertEqual(registry.all_models(), tuple(apps.get_models(include_auto_created=True)))
+
+    def test_get_model(self):
+        self.assertIs(registry.get_model('products.Product'), models.Product)
+        self.assertIs(registry.get_model('PRODUCTS.product'), models.Product)
+        with self.assertRaises(LookupError):
+            registry.get_model('products.Missing')
+
+    @isolate_apps('products')
+    def test_class_prepared(self):
+        registry.get_index()
+        self.assertGreater(len(registry._index), 0)
+
+        class Entry(django_models.Model):
+            class Meta:
+                app_label = 'products'
+
+        self.assertEqual(registry._index, {})
+        self.assertNotIn(Entry, registry.models_for_label('products'))
+        self.assertIs(registry.get_model('products.Product'), models.Product)
+
+
+class TrieResolverTest(TestCase):
+    """The `TrieResolver` gives the matches and 404s of a flat resolver of
+    the same patterns.
+    """
+
+    def setUp(self):
+        from products import views
+
+        view_names = names.crud() + names.bulk() + names.history()
+        self.patterns = urls.paths_default(views, grab_models(models), views=view_names,
+                                           trie=False)
+        self.flat = URLResolver(RoutePattern(''), self.patterns)
+        self.trie = TrieResolver(self.patterns)
+
+    def resolve(self, resolver, path):
+        try:
+            match = resolver.resolve(path)
+        except Resolver404:
+            return None
+        return (match.func, match.args, match.kwargs, match.url_name, match.route,)
+
+    def test_matches(self):
+        values = {'int': '12', 'str': 'ab1'}
+        paths = [
+            re.sub(r'<(\w+):\w+>', lambda m: values[m[1]], str(x.pattern))
+            for x in self.patterns
+        ]
+        for path in paths:
+            match = self.resolve(self.trie, path)
+            self.assertIsNotNone(match, path)
+            self.assertEqual(match, self.resolve(self.flat, path), path)
+
+    def test_not_found(self):
+        for path in ('', 'product/', 'product/list', 'product/list/more/', 'products/list/',
+                     'product/detail/', 'product/detail/1/2/', 'nothing/here/'):
+            self.assertIsNone(self.resolve(self.flat, path), path)
+            with self.assertRaises(Resolver404, msg=path):
+                self.trie.resolve(path)
+
+    def test_trie_paths(self):
+        from products import views
+
+        resolver, = urls.paths_default(views, grab_models(models), trie=True)
+        self.assertIsInstance(resolver, TrieResolver)
+        match = resolver.resolve('product/detail/3/')
+        self.assertEqual((match.url_name, match.kwargs), ('product-detail', {'pk': '3'}))
+
+
+class RouteSnapshotTest(TestCase):
+    """A warm start builds the `paths_default` patterns from the snapshot
+    file, without the route compile; any change of the key rebuilds it.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot = directory.name
+
+    def entries(self, patterns):
+        return [(str(x.pattern), x.name, x.callback.view_class) for x in patterns]
+
+    def test_warm_start(self):
+        from products import views
+
+        view_names = names.crud() + names.history()
+        cold = urls.paths_default(views, models, views=view_names, snapshot=self.snapshot, trie=False)
+        filename = os.path.join(self.snapshot, f'{views.__name__}.routes.json')
+        self.assertTrue(os.path.exists(filename))
+
+        urls.timings.clear()
+        warm = urls.paths_default(views, models, views=view_names, snapshot=self.snapshot, trie=False)
+        self.assertNotIn('compile_routes', urls.timings)
+        self.assertEqual(self.entries(warm), self.entries(cold))
+
+        # Other view names are another key; compiled and stored again.
+        urls.paths_default(views, models, snapshot=self.snapshot, trie=False)
+        self.assertIn('compile_routes', urls.timings)
+
+    def test_route_key(self):
+        from products import views
+
+        key = urls.route_key(views, models, names.crud())
+        self.assertEqual(key, urls.route_key(views, models, names.crud()))
+        self.assertNotEqual(key, urls.route_key(views, models, names.crud(), False))
+        self.assertNotEqual(key, urls.route_key(views, [models.Product], names.crud()))
+        self.assertIsNone(urls.load_routes(os.path.join(self.snapshot, 'missing.json'), key))
+
+    def test_write_error(self):
+        from products import views
+
+        # A file in place of the directory.
+        blocked = os.path.join(self.snapshot, 'blocked')
+        open(blocked, 'w').close()
+        with self.assertWarns(RuntimeWarning):
+            patterns = urls.paths_default(views, models, snapshot=blocked, trie=False)
+        self.assertTrue(patterns)
+        self.assertEqual(os.listdir(self.snapshot), ['blocked'])
+
+
+class PrinterPlanTest(TestCase):
+    """The printers render through a plan compiled once per class, rebuilt
+    when a short class attribute changes.
+    """
+
+    def setUp(self):
+        self.addCleanup(signals.clear_plans)
+        self.item_class = type('Item', (), {
+            'pk': 1, 'name': 'apple', 'count': 3,
+            '_short_string': '"{self.name}" x{self.count}',
+        })
+
+    def test_compile_format(self):
+        format_str, parts = signals.compile_format('"{self.name}" x{self.count!r:>3}')
+        self.assertEqual([(x[0], x[2], x[3]) for x in parts],
+                         [('"', None, ''), ('" x', repr, '>3')])
+        self.assertEqual(signals.render_format((format_str, parts), self.item_class()), '"apple" x  3')
+        # Not compiled; rendered by str.format.
+        self.assertIsNone(signals.compile_format('{self.name[0]}')[1])
+        self.assertIsNone(signals.compile_format('{self')[1])
+        self.assertEqual(signals.render_format(signals.compile_format('{self.name[0]}'),
+                                               self.item_class()), 'a')
+
+    def test_compile_plan(self):
+        alts = ('_short_string',)
+        self.assertEqual(signals.compile_plan(self.item_class, alts),
+                         (None, signals.compile_format('"{self.name}" x{self.count}')))
+        self.item_class.get_short_string = lambda self: None
+        self.item_class._short_props = ('name', 'count',)
+        props = signals.compile_format('name="{self.name}", count="{self.count}"')
+        self.assertEqual(signals.compile_plan(self.item_class, alts), ('get_short_string', props))
+
+    def test_cached_plan(self):
+        alts = ('_short_string',)
+        plan = signals.get_plan(self.item_class, alts)
+        self.assertIs(signals.get_plan(self.item_class, alts), plan)
+        self.assertEqual(signals.str_printer(self.item_class()), '"apple" x3')
+        self.assertEqual(signals.repr_printer(self.item_class()), '<Item(1) \'"apple" x3\'>')
+
+    def test_invalidation(self):
+        item = self.item_class()
+        self.assertEqual(signals.str_printer(item), '"apple" x3')
+        self.item_class._short_string = '{self.name}'
+        self.assertEqual(signals.str_printer(item), 'apple')
+        # An attribute missing when the plan was built.
+        self.item_class.get_short_string = lambda self: '{self.count}'
+        self.assertEqual(signals.str_printer(item), '3')
+        del self.item_class.get_short_string
+        self.assertEqual(signals.str_printer(item), 'apple')
+
+
+class PrinterInstallTest(TestCase):
+    """The 'class' `SHORT_PRINTER_MODE` installs the printers on the short
+    model classes, with no `pre_init` receiver for every instance.
+    """
+
+    def test_installed(self):
+        for model in (models.Location, models.Product,):
+            self.assertIs(model.__str__, signals.str_printer)
+            self.assertIs(model.__repr__, signals.repr_printer)
+        self.assertEqual(str(models.Location(name='shelf')), 'shelf')
+        self.assertEqual(repr(models.Product(name='apple', count=2)), '<Product(None) \'"apple" x2\'>')
+
+    def test_no_pre_init(self):
+        self.assertEqual(conf.get('PRINTER_MODE'), 'class')
+        self.assertFalse(pre_init.disconnect(signals.model_pre_init))
+
+    @isolate_apps('products')
+    def test_class_prepared(self):
+        class Shelf(django_models.Model):
+            _short_props = 'name'
+            name = shorts.chars()
+
+        self.assertIs(Shelf.__str__, signals.str_printer)
+        self.assertEqual(str(Shelf(name='top')), 'top')
@@ -22,7 +22,7 @@ from . import views, models
 app_name = 'products'
 
 urlpatterns = shorts.paths_default(views, grab_models(models),
-    views=names.crud() + names.history(),
+    views=names.crud() + names.bulk() + names.history(),
 )
 
 # urlpatterns += shorts.path_urls(views, {